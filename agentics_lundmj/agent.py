@@ -1,12 +1,55 @@
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import copy
+import inspect
 import json
-import functools
+import queue
+import threading
 from pathlib import Path
-from openai import OpenAI
-from typing import Callable
+from openai import BadRequestError, NotFoundError
+from typing import Callable, Generator, Iterable, Iterator, Sequence
 
 from .tool_box import ToolBox
 from .agent_base import AIInteractable
+from .agent_history import AgentHistory, estimate_tokens
+from .agent_pool import AgentPool
+from .cascade import CONFIDENCE_INSTRUCTIONS, CascadeStats, escalation_reason
+from .client import shared_client
+from .response_cache import ResponseCache, request_key
+from .instrumentation import Span, format_turn, run_in_span, span, start_span
+from .scheduler import BACKGROUND, BATCH, Scheduler, default_scheduler, priority
+from .tool_log import tool_call_context
+
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below for an assistant that will continue it. "
+    "Keep every fact, decision, open question and identifier (names, dates, ids) "
+    "that later turns may need. Be concise."
+)
+
+_summarizer: ThreadPoolExecutor | None = None
+
+
+def _summarizer_pool() -> ThreadPoolExecutor:
+    global _summarizer
+    if _summarizer is None:
+        _summarizer = ThreadPoolExecutor(max_workers=4, thread_name_prefix='agent-summarizer')
+    return _summarizer
+
+
+def _render_for_summary(item: dict) -> str:
+    kind = item.get('type')
+    if kind == 'function_call_output':
+        return f"tool result: {item['output']}"
+    if kind == 'function_call':
+        return f"tool call: {item['name']}({item['arguments']})"
+    if 'role' in item:
+        content = item.get('content')
+        if isinstance(content, list):
+            content = ''.join(part.get('text', '') for part in content)
+        return f"{item['role']}: {content}"
+    return ''
 
 
 class Agent(AIInteractable):
@@ -15,37 +58,240 @@ class Agent(AIInteractable):
 
     - Calling `run()` starts an interaction loop reading from stdin.
     - Calling `chat_once(msg)` sends a single message and returns the response.
+    - Calling `chat_stream(msg)` sends a single message and yields the response text
+      as it arrives.
     - Calling `reset()` clears all chat history.
 
-    Both `run` and `chat_once` track history up to `history_limit` messages.
+    Both `run` and `chat_once` track history up to `history_limit` messages. With
+    `history_token_budget`, history is also trimmed (oldest first) until its
+    estimated size fits the budget. Trimming never leaves a function call output
+    without its call. The estimated input size of the latest request is kept in
+    `last_request_tokens`.
+
+    When a response holds several function calls, they are run on a thread pool
+    of up to `max_tool_workers` threads (1 runs them one by one). Outputs are
+    always appended in the order the calls were made.
+
+    With `helper_pool_size` above 1, each helper agent is backed by an `AgentPool`
+    of that many forks. Every delegated call checks out its own instance with a
+    fresh history, so several calls to one helper can run at once.
+
+    Given a `response_cache`, identical (model, history, tools) requests are served
+    from the cache. `cache_responses` sets whether that happens by default, and
+    `chat_once(msg, cache=...)` overrides it for a single call.
+
+    With `compaction_threshold`, once history holds more items than that, everything
+    but the newest `compaction_keep` items is summarized by `summary_model` in the
+    background. The summary replaces those items at the start of a later turn, so
+    chat calls never wait for it. Keep the threshold below `history_limit`, or
+    trimming will discard the old turns before their summary arrives.
+
+    With `stateful=True`, the agent keeps the id of its last response and sends only
+    the new input items along with `previous_response_id`, letting the server hold
+    the conversation. If the server no longer has it, the full history is resent.
+    Compaction, trimming and `reset()` start a new chain, so the server never sees
+    more than the local history.
+
+    A `SessionStore` can attach a journal to the agent (and its helpers); every turn
+    then appends one record to it, so the session can be resumed elsewhere.
+
+    Model requests go through a `Scheduler` (`scheduler`, or the shared
+    `default_scheduler`), which paces them against per-model rate limits, serves
+    top-level turns before helper and batch work, and retries throttled requests.
+
+    With `cascade_models`, each turn starts on the first of those (cheaper) models
+    and moves to the next one, ending with `model_name`, whenever a response fails
+    its checks: a tool call with invalid arguments, a reply containing
+    `LOW_CONFIDENCE_MARKER` (cheaper models are told to answer with it when unsure;
+    `cascade_confidence=False` turns this off), or a final reply that
+    `cascade_validator(text)` rejects. The failed response is discarded before it
+    touches history or runs any tool, and the request is resent to the next model,
+    which finishes the turn. Streamed replies from cheaper models are checked
+    before any of their text is yielded. Per-model hit rates, escalations, tokens
+    and latency are kept in `cascade_stats`.
+
+    Every turn, model request and tool call is timed as a span (see
+    `instrumentation.py`); helper agents' turns nest under the delegator's tool call.
+    With `verbose=True`, a timing and token summary is printed after each turn.
     """
 
     def __init__(self,
         prompt_file: Path | str,
         history_limit: int = 20,
         history_limit_strict: bool = False,
+        history_token_budget: int | None = None,
         model_name: str = 'gpt-4.1',
         tool_box: ToolBox = None,
         helper_agents: list['Agent'] = [],
         description: str = '',
         verbose: bool = False,
+        max_tool_workers: int = 1,
+        helper_pool_size: int = 1,
+        response_cache: ResponseCache | None = None,
+        cache_responses: bool = True,
+        compaction_threshold: int | None = None,
+        compaction_keep: int = 6,
+        summary_model: str = 'gpt-4o-mini',
+        stateful: bool = False,
+        scheduler: Scheduler | None = None,
+        cascade_models: Sequence[str] = (),
+        cascade_validator: Callable[[str], bool] | None = None,
+        cascade_confidence: bool = True,
     ):
-        self.client = OpenAI()
+        self._client = None  # built on first use, see `client`
+        self._cassette = None  # set by Cassette.attach
         self._history_limit_strict = history_limit_strict
         self._model_name = model_name
+        # cheapest first; a turn moves down the list when a response is rejected
+        self._models = list(dict.fromkeys([*cascade_models, model_name]))
+        self._tier = 0
+        self._cascade_validator = cascade_validator
+        self._cascade_confidence = cascade_confidence
+        self.cascade_stats = CascadeStats(self._models) if len(self._models) > 1 else None
         self._tool_box = tool_box
         self._helper_agents = helper_agents
         self._prompt = Path(prompt_file).read_text()
+        self.name = Path(prompt_file).stem
         self._history_limit = history_limit
+        self._history_token_budget = history_token_budget
+        self.last_request_tokens = 0
         self._description = description
         self._verbose = verbose
+        self._max_tool_workers = max_tool_workers
+        self._helper_pool_size = helper_pool_size
+        self._response_cache = response_cache
+        self._cache_responses = cache_responses
+        self._compaction_threshold = compaction_threshold
+        self._compaction_keep = compaction_keep
+        self._summary_model = summary_model
+        self._stateful = stateful
+        self._scheduler = scheduler or default_scheduler
+        self._context_tokens = 0  # estimated input the model sees, server-side context included
+        self._journal = None  # set by SessionStore.attach
+        self.session_id: str | None = None
         self._system_messages = [{ 'role': 'system', 'content': self._prompt }]
+        self._system_tokens = sum(estimate_tokens(m) for m in self._system_messages)
 
+        self._helper_pools: list[AgentPool] = []
         self._add_helper_agents()
         self.reset()
 
+    @property
+    def client(self):
+        """The OpenAI client; the process-wide shared one unless set explicitly."""
+        if self._cassette is not None:
+            # a replayed request needs no real client, so it is only built on a miss
+            return self._cassette.wrap(self._real_client, self._async_client)
+        return self._real_client()
+
+    _async_client = False  # whether `client.responses.create` is a coroutine function
+
+    def _real_client(self):
+        if self._client is None:
+            self._client = self._make_client()
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    def _make_client(self):
+        return shared_client()
+
+    @property
+    def _model(self) -> str:
+        """The model answering the current turn."""
+        return self._models[self._tier]
+
+    @property
+    def _cascading(self) -> bool:
+        """Whether a stronger model is left to escalate to."""
+        return self._tier < len(self._models) - 1
+
+    def _escalation_reason(self, output: Sequence, response_span: Span) -> str | None:
+        if not self._cascading:
+            return None
+        reason = escalation_reason(
+            output, self._tool_box, self._cascade_validator, self._cascade_confidence,
+        )
+        if reason:
+            response_span.set(escalated=reason)
+        return reason
+
     def full_history(self) -> list[dict]:
-        return self._system_messages + list(self._history)
+        return list(self._history.view(self._system_messages))
+
+    def history_tokens(self) -> int:
+        """Estimated tokens in the tracked history (excluding system messages)."""
+        return self._history.tokens
+
+    def _maybe_start_compaction(self):
+        if self._compaction_threshold is None or self._compaction is not None:
+            return
+        if len(self._history) <= self._compaction_threshold:
+            return
+        # summarize up to a message boundary, keeping the newest items verbatim
+        cut = len(self._history) - self._compaction_keep
+        while cut > 0 and not self._is_message(self._history[cut]):
+            cut -= 1
+        if cut <= 1:
+            return
+        items = list(self._history)[:cut]
+        self._compaction = (items, self._start_summary(items))
+
+    def _apply_compaction(self):
+        if self._compaction is None or not self._compaction[1].done():
+            return
+        items, summary = self._compaction
+        self._compaction = None
+        if summary.cancelled() or summary.exception() is not None:
+            return  # keep the full history; a later turn will try again
+        if len(self._history) < len(items) or any(
+            old is not new for old, new in zip(self._history, items)
+        ): return  # history was trimmed or reset since the summary started
+        self._history.drop_oldest(len(items))
+        summary_item = {
+            'role': 'system',
+            'content': f"Summary of the earlier conversation:\n{summary.result()}",
+        }
+        self._history.prepend(summary_item)
+        self._chain = None  # continue from the compacted history
+        self._journal_changes(prepend=[summary_item])
+
+    def _journal_changes(self, **extra):
+        """Append one journal record covering every history change since the last one."""
+        if self._journal is None:
+            return
+        appended, dropped = self._journal.mark
+        new = min(self._history.appended - appended, len(self._history))
+        record = dict(extra)
+        if self._history.dropped > dropped:
+            record['drop'] = self._history.dropped - dropped
+        if new:
+            record['append'] = [self._history[i] for i in range(len(self._history) - new, len(self._history))]
+        if record:
+            self._journal.record(**record)
+        self._journal.mark = (self._history.appended, self._history.dropped)
+
+    def _summary_request(self, items: list) -> dict:
+        return dict(
+            model=self._summary_model,
+            input=[
+                { 'role': 'system', 'content': SUMMARY_PROMPT },
+                { 'role': 'user', 'content': '\n'.join(map(_render_for_summary, items)) },
+            ],
+        )
+
+    def _start_summary(self, items: list):
+        request = self._summary_request(items)
+        tokens = sum(estimate_tokens(item) for item in request['input'])
+        return _summarizer_pool().submit(
+            lambda: self._scheduler.call(
+                request['model'], tokens,
+                lambda: self.client.responses.create(**request),
+                level=BACKGROUND,
+            ).output_text
+        )
 
     def _add_helper_agents(self):
         if not self._helper_agents: return
@@ -59,78 +305,333 @@ class Agent(AIInteractable):
         unique_name = f"{agent.__class__.__name__}_chat_once_{index}"
         desc_suffix = f"\n\nDescription: {agent._description}" if agent._description else ""
 
-        @functools.wraps(agent.chat_once)
-        def wrapper(*args, **kwargs):
-            return agent.chat_once(*args, **kwargs)
+        pool = None
+        if self._helper_pool_size > 1:
+            pool = AgentPool(agent, self._helper_pool_size)
+            self._helper_pools.append(pool)
+        wrapper = self._agent_tool_wrapper(agent, pool)
         wrapper.__doc__ = (agent.chat_once.__doc__ or "") + desc_suffix
 
         return unique_name, wrapper
 
-    def _get_agent_response(self):
-        return self.client.responses.create(
-            input=self.full_history(),
-            model=self._model_name,
+    def _agent_tool_wrapper(self, agent: "Agent", pool: AgentPool | None) -> Callable:
+        if pool is not None:
+            def wrapper(msg: str) -> str:
+                with pool.checkout() as helper:
+                    return helper.chat_once(msg)
+        else:
+            def wrapper(msg: str) -> str:
+                return agent.chat_once(msg)
+        return wrapper
+
+    def _chained_input(self, pending: Sequence) -> list | None:
+        """The items the server has not seen yet, or None if a full resend is needed."""
+        if self._chain is None:
+            return None
+        if self._history.dropped != self._chain[2]:
+            # the server would still hold the trimmed items; resend the history as it is now
+            return None
+        appended, sent = self._history.appended, self._chain[1]
+        if sent >= appended:
+            return list(pending[sent - appended:])
+        unsent = appended - sent
+        if unsent > len(self._history):
+            return None
+        return [self._history[i] for i in range(len(self._history) - unsent, len(self._history))] + list(pending)
+
+    def _build_request(self, pending: Sequence = ()) -> dict:
+        request = dict(
+            model=self._model,
             tools=self._tool_box.tools if self._tool_box else None,
         )
+        if self._cascading and self._cascade_confidence:
+            # not part of the history, so a chained conversation can switch models
+            request['instructions'] = CONFIDENCE_INSTRUCTIONS
+        self._context_tokens = (
+            self._system_tokens + self.history_tokens()
+            + sum(estimate_tokens(item) for item in pending)
+        )
+        if (new_items := self._chained_input(pending)) is not None:
+            request.update(input=new_items, previous_response_id=self._chain[0], store=True)
+            self.last_request_tokens = sum(estimate_tokens(item) for item in new_items)
+        else:
+            request['input'] = list(self._history.view(self._system_messages, pending))
+            self.last_request_tokens = self._context_tokens
+        return request
 
-    def _handle_tool_calls(self, response_output):
-        for item in response_output:
-            if item.type == "function_call":
-                if func := self._tool_box.get_tool_function(item.name):
+    def _chain_response(self, response_id: str, pending_count: int, output_count: int):
+        """Record that the server now holds everything up to this response's output."""
+        if self._stateful:
+            self._chain = (
+                response_id,
+                self._history.appended + pending_count + output_count,
+                self._history.dropped,
+            )
+
+    @staticmethod
+    def _chain_expired(request: dict, error: Exception) -> bool:
+        if 'previous_response_id' not in request:
+            return False
+        return (getattr(error, 'param', None) == 'previous_response_id'
+                or 'previous response' in str(error).lower().replace('_', ' '))
+
+    def _request_key(self, request: dict) -> str:
+        if self._tool_box:
+            # hash the tool box's cached JSON instead of re-serializing every schema
+            request = {**request, 'tools': self._tool_box.tools_json}
+        return request_key(**request)
+
+    def _use_cache(self, cache: bool | None) -> bool:
+        if self._response_cache is None:
+            return False
+        return self._cache_responses if cache is None else cache
+
+    def _get_agent_response(self,
+        pending: list = (),
+        stream: bool = False,
+        cache: bool | None = None,
+    ):
+        if stream:  # the caller times the stream as it consumes it
+            return self._request_response(pending, stream, cache)
+        while True:  # loop to accommodate escalation
+            with span('response', model=self._model) as response_span:
+                response = self._request_response(pending, stream, cache)
+                response_span.record_usage(response)
+                reason = self._escalation_reason(response.output, response_span)
+            if reason is None:
+                break
+            self._tier += 1  # the rejected response is dropped; the next model retries
+        self._chain_response(response.id, len(pending), len(response.output))
+        return response
+
+    def _request_response(self, pending: Sequence, stream: bool, cache: bool | None):
+        request = self._build_request(pending)
+        try:
+            return self._send_request(request, stream, cache)
+        except (BadRequestError, NotFoundError) as e:
+            if not self._chain_expired(request, e):
+                raise
+            self._chain = None  # server-side state is gone; resend everything
+            return self._send_request(self._build_request(pending), stream, cache)
+
+    def _send_request(self, request: dict, stream: bool, cache: bool | None):
+        if stream or not self._use_cache(cache):
+            return self._schedule(request, stream=stream)
+        return self._response_cache.get_or_create(
+            self._request_key(request),
+            lambda: self._schedule(request),
+        )
+
+    def _schedule(self, request: dict, **options):
+        """Send the request once the scheduler has room for it."""
+        return self._scheduler.call(
+            request['model'], self._context_tokens,
+            lambda: self.client.responses.create(**request, **options),
+        )
+
+    @staticmethod
+    def _tool_call_output(item, result) -> dict:
+        return {
+            "type": "function_call_output",
+            "call_id": item.call_id,
+            "output": json.dumps(result)
+        }
+
+    def _tool_call_context(self) -> dict:
+        """Who is calling, as recorded in tool call logs."""
+        return {"agent": self.name, "session": self.session_id}
+
+    def _run_tool_call(self, item) -> dict | None:
+        if func := self._tool_box.get_tool_function(item.name):
+            token = tool_call_context.set(self._tool_call_context())
+            try:
+                with span('tool', tool=item.name, call_id=item.call_id):
                     result = func(**json.loads(item.arguments))
-                    self._history.append({
-                        "type": "function_call_output",
-                        "call_id": item.call_id,
-                        "output": json.dumps(result)
-                    })
+                    if inspect.isawaitable(result):  # async tool or async helper agent
+                        result = asyncio.run(result)
+            finally:
+                tool_call_context.reset(token)
+            return self._tool_call_output(item, result)
+        return None
+
+    def _run_tool_calls(self, response_output) -> list[dict]:
+        calls = [item for item in response_output if item.type == "function_call"]
+        workers = min(self._max_tool_workers, len(calls))
+        if workers > 1:
+            # non-concurrent tools serialize themselves inside the ToolBox wrapper
+            # each call gets a copy of this context, so its spans nest under this turn
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(contextvars.copy_context().run, self._run_tool_call, item)
+                    for item in calls
+                ]
+                outputs = [future.result() for future in futures]
+        else:
+            outputs = [self._run_tool_call(item) for item in calls]
+        return [output for output in outputs if output]
+
+    def _handle_tool_calls(self, response_output):
+        self._history.extend(self._run_tool_calls(response_output))
     
     def reset(self):
         self.shallow_reset()
         for agent in self._helper_agents:
             agent.reset()
     
+    def fork(self) -> 'Agent':
+        """
+        Return a copy of this agent with empty history. The copy shares the client,
+        prompt, tool box and helper agents with the original.
+        """
+        clone = copy.copy(self)
+        clone._journal = None
+        clone.session_id = None
+        clone.shallow_reset()
+        return clone
+
     def shallow_reset(self):
-        if self._history_limit_strict:
-            self._history = deque(maxlen=self._history_limit)
-        else:
-            self._history = []
+        self._history = AgentHistory(self._history_limit if self._history_limit_strict else None)
+        # (last response id, history items the server has seen, history items dropped then)
+        self._chain = None
+        if self._journal is not None:
+            self._journal.record(reset=True)
+            self._journal.mark = (0, 0)
+        self._compaction = None  # (items being summarized, future summary text)
     
     def _trim_history(self):
-        if self._history_limit_strict:
-            return  # deque already enforces limit
-        self._history = self._history[-self._history_limit:]
+        drop = 0
+        if not self._history_limit_strict:  # a strict history already enforces the limit
+            drop = max(len(self._history) - self._history_limit, 0)
+        if self._history_token_budget is not None:
+            tokens = list(self._history.token_counts())
+            kept = sum(tokens[drop:])
+            while kept > self._history_token_budget and drop < len(tokens) - 1:
+                kept -= tokens[drop]
+                drop += 1
+        # only cut at a message, so function calls and their outputs stay together
+        while drop < len(self._history) and not self._is_message(self._history[drop]):
+            drop += 1
+        self._history.drop_oldest(drop)
+
+    @staticmethod
+    def _is_message(item: dict) -> bool:
+        return 'role' in item
     
-    def chat_once(self, msg: str) -> str:
+    def chat_once(self, msg: str, *, cache: bool | None = None) -> str:
         """
         Send a message to the agent.
 
         Returns the agent's response text.
         """
-        self._history.append({ 'role': 'user', 'content': msg })
-        while True: # loop to accommodate tool calls
-            response = self._get_agent_response()
-            try:
-                self._history.extend(response.output)
-            except TypeError:
-                self._history.append(response.output)
-            if not any(
-                item.type == 'function_call' for item in response.output
-            ): break
-            self._handle_tool_calls(response.output)
-        self._trim_history()
+        with span('turn', agent=self.name, session=self.session_id) as turn_span:
+            self._apply_compaction()
+            self._tier = 0
+            self._history.append({ 'role': 'user', 'content': msg })
+            iterations = 0
+            while True: # loop to accommodate tool calls
+                iterations += 1
+                turn_span.set(iterations=iterations)
+                response = self._get_agent_response(cache=cache)
+                try:
+                    self._history.extend(response.output)
+                except TypeError:
+                    self._history.append(response.output)
+                if not any(
+                    item.type == 'function_call' for item in response.output
+                ): break
+                self._handle_tool_calls(response.output)
+            self._trim_history()
+            self._journal_changes()
+            self._maybe_start_compaction()
+        self._report_turn(turn_span)
         return response.output_text
+
+    def _report_turn(self, turn_span: Span):
+        if self.cascade_stats is not None:
+            self.cascade_stats.record_turn(turn_span)
+        if self._verbose:
+            print(format_turn(turn_span))
     
-    def chat_once_dry(self, msg: str) -> str:
+    def chat_stream(self, msg: str) -> Iterator[str]:
+        """
+        Send a message to the agent, yielding text deltas as they arrive.
+
+        Tool calls are run between streamed responses. History is only updated
+        once the stream has been fully consumed.
+        """
+        # a generator shares its caller's context, so spans are parented explicitly
+        turn_span = start_span('turn', agent=self.name, session=self.session_id, stream=True)
+        finished = False
+        try:
+            self._apply_compaction()
+            self._tier = 0
+            turn = [{ 'role': 'user', 'content': msg }]
+            iterations = 0
+            while True: # loop to accommodate tool calls
+                iterations += 1
+                turn_span.set(iterations=iterations)
+                output = yield from self._stream_response(turn, turn_span)
+                turn.extend(output)
+                if not any(item.type == 'function_call' for item in output): break
+                turn.extend(run_in_span(turn_span, self._run_tool_calls, output))
+            self._history.extend(turn)
+            finished = True
+            self._trim_history()
+            self._journal_changes()
+            self._maybe_start_compaction()
+        finally:
+            if not finished:
+                # the chain already covers this turn, but history never got it
+                self._chain = None
+            turn_span.end()
+        self._report_turn(turn_span)
+
+    def _stream_response(self, turn: list, turn_span: Span) -> Generator[str, None, list]:
+        """Stream one model response, yielding its text; returns its output items."""
+        while True:  # loop to accommodate escalation
+            items, arguments, completed = {}, {}, None
+            # a cheaper model's text is held back until its response passes the checks
+            held = [] if self._cascading else None
+            response_span = start_span('response', turn_span, model=self._model)
+            for event in run_in_span(turn_span, self._get_agent_response, turn, stream=True):
+                if event.type == 'response.output_text.delta':
+                    if held is None:
+                        yield event.delta
+                    else:
+                        held.append(event.delta)
+                elif event.type == 'response.function_call_arguments.delta':
+                    arguments.setdefault(event.output_index, []).append(event.delta)
+                elif event.type == 'response.output_item.done':
+                    item = event.item
+                    if item.type == 'function_call' and event.output_index in arguments:
+                        item.arguments = ''.join(arguments[event.output_index])
+                    items[event.output_index] = item
+                elif event.type == 'response.completed':
+                    response_span.record_usage(event.response)
+                    completed = event.response
+            output = [items[index] for index in sorted(items)]
+            reason = self._escalation_reason(output, response_span)
+            response_span.end()
+            if reason is None:
+                break
+            self._tier += 1
+        if completed is not None:
+            self._chain_response(completed.id, len(turn), len(completed.output))
+        yield from held or ()
+        return output
+
+    def chat_once_dry(self, msg: str, *, cache: bool | None = None) -> str:
         """
         Send a message to the agent without any history. Does not modify history or
         use existing history.
         
         Returns the agent's response text.
         """
-        saved_history = self._history
+        saved_history = self._history, self._compaction, self._journal, self._chain
+        self._journal = None  # a dry run leaves the journal untouched
         self.reset()
-        response_text = self.chat_once(msg)
-        self._history = saved_history
+        response_text = self.chat_once(msg, cache=cache)
+        self._history, self._compaction, self._journal, self._chain = saved_history
         return response_text
     
 
@@ -177,6 +678,83 @@ class AgentSequence(AIInteractable):
             print(f"[AgentSequence] Intermediate output: {msg}")
         return msg
 
+    def chat_stream(self, msg: str) -> Iterator[str]:
+        """Run every stage but the last to completion, then stream the last stage."""
+        *stages, last = self.interactables
+        for interactable in stages:
+            msg = interactable.chat_once(msg)
+            print(f"[AgentSequence] Intermediate output: {msg}")
+        yield from last.chat_stream(msg)
+
+    def map(self,
+        inputs: Iterable[str],
+        concurrency: int | Sequence[int] = 1,
+        queue_size: int = 1,
+        isolate_history: bool = False,
+    ) -> list[str]:
+        """
+        Push a batch of inputs through the sequence as a pipeline, so stage N works on
+        item k while stage N-1 works on item k+1.
+
+        `concurrency` caps the workers per stage (one value for every stage, or one per
+        stage) and `queue_size` bounds the queue feeding each stage. With
+        `isolate_history`, every item runs on a fresh `fork()` of each stage so items
+        never see each other's history; more than one worker per stage requires it.
+
+        Returns the outputs in input order. If any item fails, the first failure (by
+        input order) is raised once the batch has drained.
+        """
+        stages = self.interactables
+        limits = [concurrency] * len(stages) if isinstance(concurrency, int) else list(concurrency)
+        if len(limits) != len(stages):
+            raise ValueError("concurrency must give one limit per stage")
+        if not isolate_history and any(limit > 1 for limit in limits):
+            raise ValueError("More than one worker per stage requires isolate_history=True")
+
+        done = object()
+        queues = [queue.Queue(maxsize=queue_size) for _ in stages] + [queue.Queue()]
+        errors = {}
+
+        def work(index: int):
+            stage = stages[index]
+            with priority(BATCH):  # yield to interactive turns
+                while (job := queues[index].get()) is not done:
+                    k, msg = job
+                    if k not in errors:  # a failed item skips the remaining stages
+                        try:
+                            msg = (stage.fork() if isolate_history else stage).chat_once(msg)
+                        except Exception as e:
+                            errors[k] = e
+                    queues[index + 1].put((k, msg))
+
+        workers = [
+            [threading.Thread(target=work, args=(index,), daemon=True) for _ in range(limit)]
+            for index, limit in enumerate(limits)
+        ]
+        for thread in (thread for stage_workers in workers for thread in stage_workers):
+            thread.start()
+
+        count = 0
+        for count, msg in enumerate(inputs, start=1):
+            queues[0].put((count - 1, msg))
+        # shut stages down front to back once each one's input is exhausted
+        for index, stage_workers in enumerate(workers):
+            for _ in stage_workers:
+                queues[index].put(done)
+            for thread in stage_workers:
+                thread.join()
+
+        results = [None] * count
+        while not queues[-1].empty():
+            k, msg = queues[-1].get()
+            results[k] = msg
+        if errors:
+            raise errors[min(errors)]
+        return results
+
+    def fork(self) -> 'AgentSequence':
+        return AgentSequence(*(interactable.fork() for interactable in self.interactables))
+
     def reset(self):
         for interactable in self.interactables:
             interactable.reset()
@@ -1,4 +1,4 @@
-from typing import Optional, Callable
+from typing import Optional, Callable, Iterator
 
 class AIInteractable:
     """An interface for AI agents that can interact with users."""
@@ -12,26 +12,50 @@ class AIInteractable:
         print('\nAI:', *args) 
         print('-'*60 + '\n')   
 
+    def _print_agent_stream(self, chunks: Iterator[str]) -> str:
+        print('\nAI: ', end='', flush=True)
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            print(chunk, end='', flush=True)
+        print('\n' + '-'*60 + '\n')
+        return ''.join(parts)
+
     def run(self,
         input_fn: Optional[Callable] = None,
-        callback_fn: Optional[Callable] = None
+        callback_fn: Optional[Callable] = None,
+        stream: bool = False,
     ):
         """
         Start an interaction loop with the agent.
 
         Inputs are read from stdin until an empty line or 'exit' is entered.
+        With `stream=True` the response is printed as it arrives, and `callback_fn`
+        (if given) receives the full text once the response is complete.
         """
-        callback_fn = callback_fn or self._print_agent_response
         input_fn = input_fn or self._get_user_input
 
         try:
             while msg := input_fn():
-                callback_fn(self.chat_once(msg))
+                if stream:
+                    text = self._print_agent_stream(self.chat_stream(msg))
+                    if callback_fn:
+                        callback_fn(text)
+                else:
+                    (callback_fn or self._print_agent_response)(self.chat_once(msg))
         except KeyboardInterrupt:
             print('\nRun interrupted by user (KeyboardInterrupt)')
 
     def chat_once(self, msg: str) -> str:
         raise NotImplementedError
 
+    def chat_stream(self, msg: str) -> Iterator[str]:
+        """Yield the response text in pieces. Defaults to a single `chat_once` piece."""
+        yield self.chat_once(msg)
+
+    def fork(self) -> 'AIInteractable':
+        """Return an independent copy with empty history."""
+        raise NotImplementedError
+
     def reset(self):
         raise NotImplementedError
@@ -1,11 +1,148 @@
-from typing import Optional
+import json
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, Optional
+
+
+def to_wire(item) -> dict:
+    """Convert an input item (dict or SDK model) to its JSON-ready dict form."""
+    if hasattr(item, 'model_dump'):
+        return item.model_dump(mode='json', exclude_none=True)
+    return item
+
+
+def estimate_tokens(item) -> int:
+    """Roughly estimate the tokens an input item costs (about 4 characters per token)."""
+    return _estimate(json.dumps(to_wire(item), default=str))
+
+
+def _estimate(serialized: str) -> int:
+    return len(serialized) // 4 + 1
 
 
 class AgentHistory:
-    """A class to manage the history of interactions for an AI agent."""
+    """
+    A ring buffer of conversation items, kept in wire (JSON-ready dict) form.
+
+    Each item is converted and token-estimated once, when it is appended. With a
+    `limit`, appending to a full buffer overwrites the oldest item. Without one, the
+    buffer grows as needed. Appending and dropping from the front are O(1) per item.
+
+    `appended` and `dropped` count every item ever added or removed, so callers can
+    tell what changed between two points in time.
+    """
+
+    __slots__ = (
+        '_items', '_tokens', '_head', '_size', '_limit',
+        'tokens', 'appended', 'dropped',
+    )
 
     def __init__(self, limit: Optional[int] = None):
-        self._history = []
+        capacity = limit or 16
+        self._items: list[Any] = [None] * capacity
+        self._tokens: list[int] = [0] * capacity
+        self._head = 0
+        self._size = 0
         self._limit = limit
-    
-    
\ No newline at end of file
+        self.tokens = 0
+        self.appended = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[dict]:
+        capacity = len(self._items)
+        for i in range(self._size):
+            yield self._items[(self._head + i) % capacity]
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("history index out of range")
+        return self._items[(self._head + index) % len(self._items)]
+
+    def _slot(self, index: int) -> int:
+        return (self._head + index) % len(self._items)
+
+    def _grow(self):
+        order = [self._slot(i) for i in range(self._size)]
+        extra = len(self._items)
+        self._items = [self._items[i] for i in order] + [None] * extra
+        self._tokens = [self._tokens[i] for i in order] + [0] * extra
+        self._head = 0
+
+    def _store(self, slot: int, item) -> dict:
+        wire = to_wire(item)
+        self._items[slot] = wire
+        self._tokens[slot] = _estimate(json.dumps(wire, default=str))
+        self.tokens += self._tokens[slot]
+        return wire
+
+    def append(self, item):
+        if self._size == len(self._items):
+            if self._limit is None:
+                self._grow()
+            else:
+                self.drop_oldest(1)
+        self._store(self._slot(self._size), item)
+        self._size += 1
+        self.appended += 1
+
+    def extend(self, items: Iterable):
+        for item in items:
+            self.append(item)
+
+    def prepend(self, item):
+        """Insert an item before the oldest one (e.g. a summary of dropped turns)."""
+        if self._size == len(self._items):
+            if self._limit is not None:
+                raise IndexError("history is full")
+            self._grow()
+        self._head = (self._head - 1) % len(self._items)
+        self._store(self._head, item)
+        self._size += 1
+
+    def drop_oldest(self, count: int):
+        for _ in range(min(count, self._size)):
+            self.tokens -= self._tokens[self._head]
+            self._items[self._head] = None
+            self._head = (self._head + 1) % len(self._items)
+            self._size -= 1
+            self.dropped += 1
+
+    def clear(self):
+        self.drop_oldest(self._size)
+
+    def token_counts(self) -> Iterator[int]:
+        """Yield each item's estimated tokens, oldest first."""
+        for i in range(self._size):
+            yield self._tokens[self._slot(i)]
+
+    def view(self, prefix: Sequence = (), suffix: Sequence = ()) -> 'HistoryView':
+        return HistoryView(prefix, self, suffix)
+
+
+class HistoryView(Sequence):
+    """A read-only `prefix + history + suffix` sequence that copies nothing."""
+
+    __slots__ = ('_parts',)
+
+    def __init__(self, *parts: Sequence):
+        self._parts = parts
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._parts)
+
+    def __iter__(self) -> Iterator[dict]:
+        for part in self._parts:
+            yield from part
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += len(self)
+        for part in self._parts:
+            if index < len(part):
+                return part[index]
+            index -= len(part)
+        raise IndexError("history index out of range")
@@ -0,0 +1,44 @@
+import asyncio
+import queue
+from contextlib import asynccontextmanager, contextmanager
+
+
+class AgentPool:
+    """
+    A fixed-size pool of forks of one agent.
+
+    `checkout()` lends out an instance with its own history and resets it when it is
+    returned, so concurrent callers never share a history. When every instance is
+    checked out, callers wait for one to come back.
+    """
+
+    def __init__(self, agent, size: int):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.agent = agent
+        self.size = size
+        self.instances = [agent.fork() for _ in range(size)]
+        self._free = queue.Queue()
+        for instance in self.instances:
+            self._free.put(instance)
+
+    def _release(self, instance):
+        instance.shallow_reset()
+        self._free.put(instance)
+
+    @contextmanager
+    def checkout(self):
+        instance = self._free.get()
+        try:
+            yield instance
+        finally:
+            self._release(instance)
+
+    @asynccontextmanager
+    async def checkout_async(self):
+        loop = asyncio.get_running_loop()
+        instance = await loop.run_in_executor(None, self._free.get)
+        try:
+            yield instance
+        finally:
+            self._release(instance)
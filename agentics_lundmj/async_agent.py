@@ -0,0 +1,209 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+from openai import BadRequestError, NotFoundError
+
+from .agent import Agent, _summarizer_pool
+from .agent_history import estimate_tokens
+from .agent_pool import AgentPool
+from .client import shared_async_client
+from .instrumentation import span
+from .scheduler import BACKGROUND
+from .tool_log import tool_call_context
+
+# set while a sync `chat_once` drives the turn on a loop that closes when it returns
+_short_lived_loop: ContextVar[bool] = ContextVar("short_lived_loop", default=False)
+
+
+class AsyncAgent(Agent):
+    """
+    An `Agent` driven by asyncio over `AsyncOpenAI`, so many conversations can share
+    one event loop.
+
+    - Calling `await chat_once_async(msg)` sends a single message and returns the response.
+    - Async tools are awaited directly; sync tools run in the loop's default executor.
+    - `AsyncAgent` helpers are exposed to the model as async tools.
+
+    `chat_once` (and therefore `run`) still works from synchronous code by running
+    `chat_once_async` on a fresh event loop.
+    """
+
+    _async_client = True
+
+    def _real_client(self):
+        # async connection pools are tied to an event loop, so the shared client is
+        # looked up on every use instead of being kept
+        return self._client if self._client is not None else self._make_client()
+
+    def _make_client(self):
+        return shared_async_client()
+
+    def _agent_tool_wrapper(self, agent: Agent, pool: AgentPool | None) -> Callable:
+        if not isinstance(agent, AsyncAgent):
+            return super()._agent_tool_wrapper(agent, pool)
+
+        if pool is not None:
+            async def wrapper(msg: str) -> str:
+                async with pool.checkout_async() as helper:
+                    return await helper.chat_once_async(msg)
+        else:
+            async def wrapper(msg: str) -> str:
+                return await agent.chat_once_async(msg)
+        return wrapper
+
+    def _start_summary(self, items: list):
+        # runs as a task on the caller's loop (or on a thread if that loop is about
+        # to close); the chat path only checks done()
+        request = self._summary_request(items)
+
+        tokens = sum(estimate_tokens(item) for item in request['input'])
+
+        async def summarize():
+            response = await self._scheduler.call_async(
+                request['model'], tokens,
+                lambda: self.client.responses.create(**request),
+                level=BACKGROUND,
+            )
+            return response.output_text
+        if _short_lived_loop.get():
+            # asyncio.run would cancel a task still pending when the turn returns
+            return _summarizer_pool().submit(asyncio.run, summarize())
+        return asyncio.ensure_future(summarize())
+
+    async def _get_agent_response_async(self, cache: bool | None = None):
+        while True:  # loop to accommodate escalation
+            with span('response', model=self._model) as response_span:
+                request = self._build_request()
+                try:
+                    response = await self._send_request_async(request, cache)
+                except (BadRequestError, NotFoundError) as e:
+                    if not self._chain_expired(request, e):
+                        raise
+                    self._chain = None  # server-side state is gone; resend everything
+                    response = await self._send_request_async(self._build_request(), cache)
+                response_span.record_usage(response)
+                reason = self._escalation_reason(response.output, response_span)
+            if reason is None:
+                break
+            self._tier += 1  # the rejected response is dropped; the next model retries
+        self._chain_response(response.id, 0, len(response.output))
+        return response
+
+    async def _send_request_async(self, request: dict, cache: bool | None):
+        if not self._use_cache(cache):
+            return await self._schedule_async(request)
+        return await self._response_cache.get_or_create_async(
+            self._request_key(request),
+            lambda: self._schedule_async(request),
+        )
+
+    def _schedule_async(self, request: dict):
+        return self._scheduler.call_async(
+            request['model'], self._context_tokens,
+            lambda: self.client.responses.create(**request),
+        )
+
+    async def _run_tool_call_async(self, item) -> dict | None:
+        if func := self._tool_box.get_tool_function(item.name):
+            kwargs = json.loads(item.arguments)
+            # each call runs in its own task, so this does not leak into other calls
+            tool_call_context.set(self._tool_call_context())
+            with span('tool', tool=item.name, call_id=item.call_id):
+                if inspect.iscoroutinefunction(func):
+                    result = await func(**kwargs)
+                else:
+                    # run_in_executor does not carry context variables over by itself
+                    context = contextvars.copy_context()
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(
+                        None, functools.partial(context.run, func, **kwargs)
+                    )
+            return self._tool_call_output(item, result)
+        return None
+
+    async def _handle_tool_calls_async(self, response_output):
+        calls = [item for item in response_output if item.type == "function_call"]
+        outputs = [None] * len(calls)
+        limit = asyncio.Semaphore(max(self._max_tool_workers, 1))
+
+        async def run(index, item):
+            async with limit:
+                outputs[index] = await self._run_tool_call_async(item)
+
+        async def run_serially(indexed_calls):
+            for index, item in indexed_calls:
+                await run(index, item)
+
+        # non-concurrent tools run one after another, alongside the concurrent ones
+        serial = [(i, item) for i, item in enumerate(calls)
+                  if not self._tool_box.is_concurrent(item.name)]
+        await asyncio.gather(
+            run_serially(serial),
+            *(run(i, item) for i, item in enumerate(calls)
+              if self._tool_box.is_concurrent(item.name)),
+        )
+        self._history.extend(output for output in outputs if output)
+
+    async def chat_once_async(self, msg: str, *, cache: bool | None = None) -> str:
+        """
+        Send a message to the agent.
+
+        Returns the agent's response text.
+        """
+        with span('turn', agent=self.name, session=self.session_id) as turn_span:
+            self._apply_compaction()
+            self._tier = 0
+            self._history.append({ 'role': 'user', 'content': msg })
+            iterations = 0
+            while True: # loop to accommodate tool calls
+                iterations += 1
+                turn_span.set(iterations=iterations)
+                response = await self._get_agent_response_async(cache=cache)
+                try:
+                    self._history.extend(response.output)
+                except TypeError:
+                    self._history.append(response.output)
+                if not any(
+                    item.type == 'function_call' for item in response.output
+                ): break
+                await self._handle_tool_calls_async(response.output)
+            self._trim_history()
+            self._journal_changes()
+            self._maybe_start_compaction()
+        self._report_turn(turn_span)
+        return response.output_text
+
+    async def chat_once_dry_async(self, msg: str, *, cache: bool | None = None) -> str:
+        """
+        Send a message to the agent without any history. Does not modify history or
+        use existing history.
+
+        Returns the agent's response text.
+        """
+        saved_history = self._history, self._compaction, self._journal, self._chain
+        self._journal = None  # a dry run leaves the journal untouched
+        self.reset()
+        response_text = await self.chat_once_async(msg, cache=cache)
+        self._history, self._compaction, self._journal, self._chain = saved_history
+        return response_text
+
+    def chat_once(self, msg: str, *, cache: bool | None = None) -> str:
+        """
+        Send a message to the agent.
+
+        Returns the agent's response text.
+        """
+        token = _short_lived_loop.set(True)
+        try:
+            return asyncio.run(self.chat_once_async(msg, cache=cache))
+        finally:
+            _short_lived_loop.reset(token)
+
+    def chat_stream(self, msg: str) -> Iterator[str]:
+        # the async client cannot be iterated synchronously; yield the whole reply
+        yield self.chat_once(msg)
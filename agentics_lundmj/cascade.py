@@ -0,0 +1,105 @@
+import threading
+from typing import Callable, Sequence
+
+from .instrumentation import Span
+from .tool_box import ToolBox
+
+# a cheaper model replies with this when it would rather hand the turn over
+LOW_CONFIDENCE_MARKER = "[ESCALATE]"
+
+CONFIDENCE_INSTRUCTIONS = (
+    "If you are not confident that you can answer correctly and completely, or the "
+    f"task needs more capability than you have, reply with exactly {LOW_CONFIDENCE_MARKER} "
+    "and nothing else. A stronger model will then take over."
+)
+
+
+def output_text(output: Sequence) -> str:
+    return ''.join(
+        part.text
+        for item in output if item.type == 'message'
+        for part in item.content if part.type == 'output_text'
+    )
+
+
+def escalation_reason(
+    output: Sequence,
+    tool_box: ToolBox | None,
+    validator: Callable[[str], bool] | None = None,
+    check_confidence: bool = True,
+) -> str | None:
+    """
+    Why a cheaper model's response should be redone by a stronger one, or None to
+    accept it:
+    - `'invalid_arguments'`: a function call names an unknown tool or its arguments
+      do not match the tool's schema,
+    - `'low_confidence'`: the reply contains `LOW_CONFIDENCE_MARKER`,
+    - `'validator'`: `validator(text)` rejected a final reply (one without tool calls).
+    """
+    calls = [item for item in output if item.type == 'function_call']
+    for call in calls:
+        if tool_box is None or tool_box.argument_errors(call.name, call.arguments):
+            return 'invalid_arguments'
+    text = output_text(output)
+    if check_confidence and LOW_CONFIDENCE_MARKER in text:
+        return 'low_confidence'
+    if validator is not None and not calls and not validator(text):
+        return 'validator'
+    return None
+
+
+class CascadeStats:
+    """
+    Per-model counters for a cascade, read from each finished turn's spans.
+
+    For every model: `turns` that reached it, turns `resolved` by it, and its
+    `hit_rate` (resolved / turns); the `responses` it gave, how many were
+    `escalated` and why, and their tokens and total time. Forks of an agent share
+    its stats.
+    """
+
+    def __init__(self, models: Sequence[str]):
+        self.models = list(models)
+        self._lock = threading.Lock()
+        self._tiers = {model: self._empty() for model in self.models}
+
+    @staticmethod
+    def _empty() -> dict:
+        return {
+            "turns": 0, "resolved": 0, "responses": 0, "escalated": {},
+            "input_tokens": 0, "output_tokens": 0, "response_ms": 0.0,
+        }
+
+    def record_turn(self, turn_span: Span):
+        responses = [s for s in turn_span.children if s.name == 'response']
+        if not responses:
+            return
+        with self._lock:
+            for response_span in responses:
+                tier = self._tiers[response_span.attributes['model']]
+                tier["responses"] += 1
+                tier["input_tokens"] += response_span.attributes.get('input_tokens', 0)
+                tier["output_tokens"] += response_span.attributes.get('output_tokens', 0)
+                tier["response_ms"] += response_span.duration_ms or 0.0
+                if reason := response_span.attributes.get('escalated'):
+                    tier["escalated"][reason] = tier["escalated"].get(reason, 0) + 1
+            # a turn runs on one model at a time, so the last response's model resolved it
+            reached = self.models.index(responses[-1].attributes['model'])
+            for model in self.models[:reached + 1]:
+                self._tiers[model]["turns"] += 1
+            self._tiers[self.models[reached]]["resolved"] += 1
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                model: {
+                    **tier,
+                    "escalated": dict(tier["escalated"]),
+                    "hit_rate": tier["resolved"] / tier["turns"] if tier["turns"] else None,
+                }
+                for model, tier in self._tiers.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._tiers = {model: self._empty() for model in self.models}
@@ -0,0 +1,172 @@
+import json
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Iterator, Literal
+
+from openai.types.responses import Response
+
+from .response_cache import request_key
+
+CassetteMode = Literal['auto', 'record', 'replay']
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    """
+    Records Responses API calls to a JSONL file and replays them by request hash.
+
+    `attach(agent)` routes the agent's (and its helpers') `responses.create` calls
+    through the cassette, leaving the shared client untouched; whichever client the
+    agent uses for a request is wrapped at that point. Modes:
+    - `'replay'`: only recorded responses are returned; anything else raises
+      `CassetteMiss`, so a run is fully offline and deterministic.
+    - `'record'`: every request goes to the API; the file is rewritten with the new
+      responses, starting at the first one recorded.
+    - `'auto'`: recorded requests are replayed, new ones are recorded.
+
+    A request made several times with identical input (e.g. the same question to a
+    fresh agent) replays its recordings in order, then repeats the last one.
+    Streaming requests share recordings with non-streaming ones; replayed streams
+    are rebuilt from the recorded response.
+    """
+
+    def __init__(self, path: str | Path, mode: CassetteMode = 'auto'):
+        if mode not in ('auto', 'record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.hits = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._responses: dict[str, list[Response]] = {}
+        self._played: dict[str, int] = {}
+        self._rewrite = mode == 'record'  # old recordings go once the first new one is in
+        if self.path.exists() and mode != 'record':
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._responses.setdefault(entry['key'], []).append(
+                            Response.model_validate(entry['response'])
+                        )
+
+    @staticmethod
+    def key(request: dict) -> str:
+        return request_key(**{k: v for k, v in request.items() if k != 'stream'})
+
+    def play(self, key: str) -> Response | None:
+        if self.mode == 'record':
+            return None
+        with self._lock:
+            recorded = self._responses.get(key)
+            if not recorded:
+                if self.mode == 'replay':
+                    raise CassetteMiss(f"No recorded response for request {key[:12]} in {self.path}")
+                return None
+            index = self._played.get(key, 0)
+            self._played[key] = index + 1
+            self.hits += 1
+            return recorded[min(index, len(recorded) - 1)]
+
+    def record(self, key: str, response: Response):
+        line = json.dumps({
+            'key': key,
+            'model': response.model,
+            'response': response.model_dump(mode='json'),
+        }) + '\n'
+        with self._lock:
+            self._responses.setdefault(key, []).append(response)
+            # a fresh recording is played back, not the ones recorded before it
+            self._played[key] = len(self._responses[key])
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'w' if self._rewrite else 'a', encoding='utf-8') as f:
+                f.write(line)
+            self._rewrite = False
+            self.recorded += 1
+
+    def attach(self, interactable):
+        """Route an agent's (or sequence's) model calls, helpers included, through this cassette."""
+        if hasattr(interactable, 'interactables'):  # AgentSequence
+            for stage in interactable.interactables:
+                self.attach(stage)
+            return
+        # wrapped on each use, so an async agent still gets the client of the running loop
+        interactable._cassette = self
+        for helper in getattr(interactable, '_helper_agents', []):
+            self.attach(helper)
+        # pooled helpers were forked before this, so they need their own wrapper
+        for pool in getattr(interactable, '_helper_pools', []):
+            for instance in pool.instances:
+                self.attach(instance)
+
+    def wrap(self, get_client: Callable, asynchronous: bool = False) -> '_CassetteClient':
+        """A client that answers from this cassette, calling `get_client()` only on a miss."""
+        return _CassetteClient(get_client, self, asynchronous)
+
+
+class _CassetteClient:
+    """Wraps a client so that only this agent's requests go through the cassette."""
+
+    def __init__(self, get_client: Callable, cassette: Cassette, asynchronous: bool):
+        self._get_client = get_client
+        wrapper = _AsyncCassetteResponses if asynchronous else _CassetteResponses
+        self.responses = wrapper(lambda: get_client().responses, cassette)
+
+    def __getattr__(self, name):
+        return getattr(self._get_client(), name)
+
+
+class _CassetteResponses:
+    def __init__(self, get_responses: Callable, cassette: Cassette):
+        self._get_responses = get_responses
+        self._cassette = cassette
+
+    def __getattr__(self, name):
+        return getattr(self._get_responses(), name)
+
+    def create(self, **request):
+        key = self._cassette.key(request)
+        stream = request.get('stream')
+        if (response := self._cassette.play(key)) is not None:
+            return _replay_stream(response) if stream else response
+        result = self._get_responses().create(**request)
+        if stream:
+            return self._record_stream(key, result)
+        self._cassette.record(key, result)
+        return result
+
+    def _record_stream(self, key: str, events) -> Iterator:
+        for event in events:
+            if event.type == 'response.completed':
+                self._cassette.record(key, event.response)
+            yield event
+
+
+class _AsyncCassetteResponses(_CassetteResponses):
+    async def create(self, **request):
+        if request.get('stream'):  # async streams pass straight through
+            return await self._get_responses().create(**request)
+        key = self._cassette.key(request)
+        if (response := self._cassette.play(key)) is not None:
+            return response
+        response = await self._get_responses().create(**request)
+        self._cassette.record(key, response)
+        return response
+
+
+def _replay_stream(response: Response) -> Iterator:
+    """The stream events an agent reads, rebuilt from a complete response."""
+    for index, item in enumerate(response.output):
+        if item.type == 'message':
+            for part in item.content:
+                if part.type == 'output_text':
+                    yield SimpleNamespace(type='response.output_text.delta', delta=part.text, output_index=index)
+        elif item.type == 'function_call':
+            yield SimpleNamespace(type='response.function_call_arguments.delta', delta=item.arguments, output_index=index)
+            item = item.model_copy()  # the agent writes the assembled arguments back
+        yield SimpleNamespace(type='response.output_item.done', item=item, output_index=index)
+    yield SimpleNamespace(type='response.completed', response=response)
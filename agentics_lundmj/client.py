@@ -0,0 +1,97 @@
+import asyncio
+import importlib.util
+import threading
+import weakref
+
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from openai._constants import DEFAULT_CONNECTION_LIMITS
+
+# the SDK's own httpx flavour, whichever it is built on
+_Limits = type(DEFAULT_CONNECTION_LIMITS)
+
+_settings = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 60.0,
+    "http2": None,  # None: use HTTP/2 when the `h2` package is installed
+    "timeout": None,  # None: the SDK's default
+}
+# the scheduler retries throttled requests itself; SDK retries would bypass its limits
+_client_options: dict = {"max_retries": 0}
+_lock = threading.Lock()
+_client: OpenAI | None = None
+_async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]' = weakref.WeakKeyDictionary()
+
+
+def configure(**options):
+    """
+    Tune the shared connection pool: `max_connections`, `max_keepalive_connections`,
+    `keepalive_expiry`, `http2` and `timeout`. Any other option (e.g. `api_key`) is
+    passed to the OpenAI client. `max_retries` defaults to 0, since the `Scheduler`
+    retries throttled requests against its own rate limits.
+
+    Call this before the first request. Agents that already hold a client keep it;
+    everything else gets a client built with the new settings.
+    """
+    global _client
+    with _lock:
+        for name, value in options.items():
+            (_settings if name in _settings else _client_options)[name] = value
+        _client = None
+        _async_clients.clear()
+
+
+def _http_options() -> dict:
+    http2 = _settings["http2"]
+    if http2 is None:
+        http2 = importlib.util.find_spec("h2") is not None
+    options = {
+        "limits": _Limits(
+            max_connections=_settings["max_connections"],
+            max_keepalive_connections=_settings["max_keepalive_connections"],
+            keepalive_expiry=_settings["keepalive_expiry"],
+        ),
+        "http2": http2,
+    }
+    if _settings["timeout"] is not None:
+        options["timeout"] = _settings["timeout"]
+    return options
+
+
+def shared_client() -> OpenAI:
+    """The process-wide OpenAI client, built on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = OpenAI(
+                    http_client=DefaultHttpxClient(**_http_options()), **_client_options
+                )
+    return _client
+
+
+def shared_async_client() -> AsyncOpenAI:
+    """
+    The shared AsyncOpenAI client for the running event loop.
+
+    An async connection pool belongs to the loop it was opened on, so each loop gets
+    its own client; it is dropped along with the loop.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _lock:
+        key = loop if loop is not None else _no_loop
+        if (client := _async_clients.get(key)) is None:
+            client = _async_clients[key] = AsyncOpenAI(
+                http_client=DefaultAsyncHttpxClient(**_http_options()), **_client_options
+            )
+        return client
+
+
+class _NoLoop:
+    """Stands in for the event loop when a client is requested outside of one."""
+
+
+_no_loop = _NoLoop()
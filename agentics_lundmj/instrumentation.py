@@ -0,0 +1,175 @@
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .tool_log import ToolCallLogger
+
+_current_span: ContextVar['Span | None'] = ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+_sinks: list['SpanSink'] = []
+
+
+class Span:
+    """
+    One timed unit of work: an agent turn, a model request or a tool call.
+
+    Spans nest through a context variable, so a helper agent's turn becomes a child
+    of the delegator's tool call. Finished spans are sent to every registered sink.
+    """
+
+    __slots__ = ('name', 'attributes', 'span_id', 'parent', 'children', 'start', '_started', 'duration_ms')
+
+    def __init__(self, name: str, parent: 'Span | None' = None, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.span_id = next(_span_ids)
+        self.parent = parent
+        self.children: list[Span] = []
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms: float | None = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def record_usage(self, response):
+        """Copy token counts from a Responses API response, if it has any."""
+        if usage := getattr(response, 'usage', None):
+            details = getattr(usage, 'input_tokens_details', None)
+            self.set(
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                cached_tokens=getattr(details, 'cached_tokens', 0) or 0,
+            )
+
+    def end(self):
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        if self.parent is not None:
+            self.parent.children.append(self)
+        for sink in list(_sinks):
+            sink.emit(self)
+
+    def walk(self) -> Iterator['Span']:
+        """Yield this span and all of its descendants."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            **self.attributes,
+        }
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def start_span(name: str, parent: Span | None = None, **attributes) -> Span:
+    """
+    Start a span without making it current; call `end()` when done.
+
+    For generators, which share their caller's context and so cannot safely hold a
+    context variable across a `yield`.
+    """
+    return Span(name, parent if parent is not None else _current_span.get(), **attributes)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Time the enclosed block as a child of the current span."""
+    s = start_span(name, **attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.set(error=repr(e))
+        raise
+    finally:
+        _current_span.reset(token)
+        s.end()
+
+
+def run_in_span(s: Span, fn: Callable, *args, **kwargs) -> Any:
+    """Call `fn` in a copy of the current context where `s` is the current span."""
+    def run():
+        _current_span.set(s)
+        return fn(*args, **kwargs)
+    return contextvars.copy_context().run(run)
+
+
+class SpanSink:
+    """Receives every span as it ends. Subclasses implement `emit`."""
+
+    def emit(self, span: Span):
+        raise NotImplementedError
+
+
+class MemorySink(SpanSink):
+    """Keeps finished spans in memory, e.g. for tests or benchmarks."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def emit(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def roots(self) -> list[Span]:
+        return [s for s in self.spans if s.parent is None]
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+class JsonlSink(SpanSink):
+    """Appends each span as a JSON line, written by a background thread."""
+
+    def __init__(self, path: str | Path, **logger_options):
+        self._logger = ToolCallLogger(path, **logger_options)
+
+    def emit(self, span: Span):
+        self._logger.record(**span.to_dict())
+
+    def close(self):
+        self._logger.close()
+
+
+def add_sink(sink: SpanSink) -> SpanSink:
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: SpanSink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def format_turn(turn: Span) -> str:
+    """A one-line timing summary of a finished turn span."""
+    responses = [s for s in turn.walk() if s.name == 'response']
+    tools = [s for s in turn.children if s.name == 'tool']
+    input_tokens = sum(s.attributes.get('input_tokens', 0) for s in responses)
+    output_tokens = sum(s.attributes.get('output_tokens', 0) for s in responses)
+    model_ms = sum(s.duration_ms for s in turn.children if s.name == 'response')
+    tool_ms = sum(s.duration_ms for s in tools)
+    return (
+        f"[{turn.attributes.get('agent')}] turn {turn.duration_ms / 1000:.2f}s, "
+        f"{turn.attributes.get('iterations', 0)} iterations | "
+        f"model {model_ms / 1000:.2f}s | tools {tool_ms / 1000:.2f}s ({len(tools)} calls) | "
+        f"tokens {input_tokens} in / {output_tokens} out (incl. helpers)"
+    )
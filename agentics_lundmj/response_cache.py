@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from openai.types.responses import Response
+
+
+def _to_wire(obj):
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump(mode='json', exclude_none=True)
+    raise TypeError(f"Cannot serialize {type(obj).__name__} for a cache key")
+
+
+def request_key(**request) -> str:
+    """Return a canonical SHA-256 hash of a Responses API request."""
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'), default=_to_wire)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Base class for exact-match response caches.
+
+    Subclasses implement `get` and `set`. `get_or_create` adds single-flight
+    deduplication: while one caller is fetching a key, other callers asking for the
+    same key wait for that result instead of sending their own request.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Response | None:
+        raise NotImplementedError
+
+    def set(self, key: str, response: Response):
+        raise NotImplementedError
+
+    def _lookup(self, key: str) -> tuple[Response | None, Future, bool]:
+        if (hit := self.get(key)) is not None:
+            self.hits += 1
+            return hit, None, False
+        with self._inflight_lock:
+            if (future := self._inflight.get(key)) is not None:
+                self.hits += 1
+                return None, future, False
+            self.misses += 1
+            future = self._inflight[key] = Future()
+            return None, future, True
+
+    def _finish(self, key: str, future: Future, response=None, error=None):
+        with self._inflight_lock:
+            del self._inflight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            self.set(key, response)
+            future.set_result(response)
+
+    def get_or_create(self, key: str, create: Callable[[], Response]) -> Response:
+        hit, future, leader = self._lookup(key)
+        if hit is not None:
+            return hit
+        if not leader:
+            return future.result()
+        try:
+            response = create()
+        except BaseException as e:  # cancellation too, or the key would stay in flight
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, response)
+        return response
+
+    async def get_or_create_async(self, key: str, create: Callable[[], Awaitable[Response]]) -> Response:
+        hit, future, leader = self._lookup(key)
+        if hit is not None:
+            return hit
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            response = await create()
+        except BaseException as e:  # cancellation too, or the key would stay in flight
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, response)
+        return response
+
+
+class MemoryCache(ResponseCache):
+    """An in-memory LRU cache holding up to `max_size` responses for `ttl` seconds."""
+
+    def __init__(self, max_size: int = 256, ttl: float | None = None):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Response]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Response | None:
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                return None
+            created, response = entry
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: Response):
+        with self._lock:
+            self._entries[key] = (time.time(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(ResponseCache):
+    """
+    An on-disk cache in a SQLite file. Keeps at most `max_size` responses (least
+    recently used are evicted first), each for `ttl` seconds.
+    """
+
+    def __init__(self, path: str | Path, max_size: int | None = None, ttl: float | None = None):
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, created REAL, accessed REAL, body TEXT)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Response | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            created, body = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return Response.model_validate_json(body)
+
+    def set(self, key: str, response: Response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, now, now, response.model_dump_json()),
+            )
+            if self.max_size is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key NOT IN ("
+                    "SELECT key FROM responses ORDER BY accessed DESC LIMIT ?)",
+                    (self.max_size,),
+                )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+class TieredCache(ResponseCache):
+    """
+    Checks each tier in order (e.g. `MemoryCache`, then `SQLiteCache`). A hit in a
+    slower tier is copied into the faster tiers in front of it.
+    """
+
+    def __init__(self, *tiers: ResponseCache):
+        super().__init__()
+        self.tiers = tiers
+
+    def get(self, key: str) -> Response | None:
+        for index, tier in enumerate(self.tiers):
+            if (response := tier.get(key)) is not None:
+                for faster in self.tiers[:index]:
+                    faster.set(key, response)
+                return response
+        return None
+
+    def set(self, key: str, response: Response):
+        for tier in self.tiers:
+            tier.set(key, response)
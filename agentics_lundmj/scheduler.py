@@ -0,0 +1,301 @@
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, TypeVar
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+# failures the SDK would retry by itself; its own retries are off (see client.py)
+_TRANSIENT = (APIConnectionError, InternalServerError)
+
+from .instrumentation import current_span
+
+T = TypeVar('T')
+
+# request priorities; lower numbers go first
+INTERACTIVE = 0  # a user-facing turn
+HELPER = 1  # a helper agent working on a delegated task
+BATCH = 2  # pipelines and bulk jobs
+BACKGROUND = 3  # housekeeping such as history summaries
+
+_priority: ContextVar[int | None] = ContextVar("request_priority", default=None)
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """Schedule every model request made inside this block at `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    """The explicit priority if one is set, else HELPER inside a tool call, else INTERACTIVE."""
+    if (level := _priority.get()) is not None:
+        return level
+    span = current_span()
+    while span is not None:
+        if span.name == 'tool':  # the request comes from a helper agent
+            return HELPER
+        span = span.parent
+    return INTERACTIVE
+
+
+class _Bucket:
+    """A token bucket holding at most `capacity`, refilled evenly over a minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # a request bigger than the bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        return max(amount - self.level, 0) / self.rate
+
+    def take(self, amount: float):
+        self.level -= amount  # may go negative when a large estimate is corrected
+
+
+class _ModelQueue:
+    def __init__(self):
+        self.requests: _Bucket | None = None
+        self.tokens: _Bucket | None = None
+        self.waiting: list[tuple[int, int]] = []  # heap of (priority, ticket)
+        self.blocked_until = 0.0  # set after a 429, so nobody else piles on
+        self.stats = {"requests": 0, "throttled": 0, "retries": 0, "waited_ms": 0.0, "max_queued": 0}
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        if self.blocked_until <= now:
+            self.blocked_until = 0.0
+        wait = max(self.blocked_until - now, 0)
+        if self.requests:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+
+class Scheduler:
+    """
+    Paces model requests across every agent that shares it.
+
+    Each model can have a requests-per-minute and a tokens-per-minute limit, tracked
+    as token buckets and charged with the request's estimated input tokens (then
+    corrected from `response.usage`). Waiting requests are served by priority:
+    interactive turns first, then helper agents, batch jobs and background work
+    (see `current_priority`). A request the API throttles anyway is retried after
+    its `Retry-After`, or an exponential backoff with jitter, up to `max_retries` times.
+    Connection errors and 5xx responses are retried with the same backoff.
+
+    Models without limits pass straight through, apart from the retries.
+    """
+
+    def __init__(self,
+        limits: dict[str, tuple[int | None, int | None]] | None = None,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Condition()
+        self._tickets = itertools.count()
+        self._queues: dict[str, _ModelQueue] = {}
+        for model, (rpm, tpm) in (limits or {}).items():
+            self.set_limit(model, rpm=rpm, tpm=tpm)
+
+    def set_limit(self, model: str, rpm: int | None = None, tpm: int | None = None):
+        with self._lock:
+            queue = self._queue(model)
+            queue.requests = _Bucket(rpm) if rpm else None
+            queue.tokens = _Bucket(tpm) if tpm else None
+
+    def _queue(self, model: str) -> _ModelQueue:
+        if model not in self._queues:
+            self._queues[model] = _ModelQueue()
+        return self._queues[model]
+
+    # admission
+
+    def _enqueue(self, model: str, level: int) -> tuple[_ModelQueue, tuple[int, int]]:
+        with self._lock:
+            queue = self._queue(model)
+            entry = (level, next(self._tickets))
+            heapq.heappush(queue.waiting, entry)
+            queue.stats["max_queued"] = max(queue.stats["max_queued"], len(queue.waiting))
+            return queue, entry
+
+    def _try_admit(self, queue: _ModelQueue, entry: tuple, tokens: int) -> float:
+        """Admit the entry and return 0, or return how long to wait before retrying."""
+        now = time.monotonic()
+        if queue.waiting[0] != entry:
+            # someone more urgent is ahead; check again once they have had a chance
+            return max(queue.wait_time(tokens, now), 0.01)
+        wait = queue.wait_time(tokens, now)
+        if wait > 0:
+            return wait
+        heapq.heappop(queue.waiting)
+        if queue.requests:
+            queue.requests.take(1)
+        if queue.tokens:
+            queue.tokens.take(tokens)
+        queue.stats["requests"] += 1
+        self._lock.notify_all()
+        return 0
+
+    def _abandon(self, queue: _ModelQueue, entry: tuple):
+        with self._lock:
+            if entry in queue.waiting:
+                queue.waiting.remove(entry)
+                heapq.heapify(queue.waiting)
+                self._lock.notify_all()
+
+    def _admit_unlimited(self, model: str) -> bool:
+        """Admit at once if the model has no limits and is not backing off."""
+        with self._lock:
+            queue = self._queue(model)
+            if queue.requests or queue.tokens or queue.waiting or queue.blocked_until:
+                return False
+            queue.stats["requests"] += 1
+            return True
+
+    def _acquire(self, model: str, tokens: int, level: int):
+        if self._admit_unlimited(model):
+            return
+        queue, entry = self._enqueue(model, level)
+        started = time.monotonic()
+        try:
+            with self._lock:
+                while (wait := self._try_admit(queue, entry, tokens)) > 0:
+                    self._lock.wait(timeout=wait)
+                queue.stats["waited_ms"] += (time.monotonic() - started) * 1000
+        except BaseException:  # e.g. KeyboardInterrupt; do not block the queue
+            self._abandon(queue, entry)
+            raise
+
+    async def _acquire_async(self, model: str, tokens: int, level: int):
+        if self._admit_unlimited(model):
+            return
+        queue, entry = self._enqueue(model, level)
+        started = time.monotonic()
+        try:
+            # polls rather than blocking, so the event loop keeps running
+            while True:
+                with self._lock:
+                    wait = self._try_admit(queue, entry, tokens)
+                if not wait:
+                    break
+                await asyncio.sleep(min(wait, 0.05))
+        except BaseException:
+            self._abandon(queue, entry)
+            raise
+        with self._lock:
+            queue.stats["waited_ms"] += (time.monotonic() - started) * 1000
+
+    # accounting
+
+    def _settle(self, model: str, estimated: int, response):
+        """Correct the token bucket with the tokens the request actually used."""
+        usage = getattr(response, 'usage', None)
+        queue = self._queues[model]
+        if usage is None or queue.tokens is None:
+            return
+        with self._lock:
+            queue.tokens.take(usage.total_tokens - estimated)
+
+    def _backoff(self, attempt: int) -> float:
+        backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return random.uniform(backoff / 2, backoff)
+
+    def _throttled(self, model: str, error: RateLimitError, attempt: int) -> float:
+        retry_after = None
+        if (response := getattr(error, 'response', None)) is not None:
+            try:
+                retry_after = float(response.headers.get('retry-after'))
+            except (TypeError, ValueError):
+                pass
+        delay = retry_after if retry_after is not None else self._backoff(attempt)
+        with self._lock:
+            queue = self._queue(model)
+            queue.stats["throttled"] += 1
+            queue.stats["retries"] += 1
+            queue.blocked_until = max(queue.blocked_until, time.monotonic() + delay)
+        return delay
+
+    # entry points
+
+    def call(self, model: str, tokens: int, create: Callable[[], T], level: int | None = None) -> T:
+        """Run `create()` once `model` has capacity for a request of `tokens` input tokens."""
+        level = current_priority() if level is None else level
+        for attempt in itertools.count():
+            self._acquire(model, tokens, level)
+            try:
+                response = create()
+            except RateLimitError as e:
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._throttled(model, e, attempt))
+                continue
+            except _TRANSIENT:
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            self._settle(model, tokens, response)
+            return response
+
+    async def call_async(self,
+        model: str, tokens: int, create: Callable[[], Awaitable[T]], level: int | None = None,
+    ) -> T:
+        level = current_priority() if level is None else level
+        for attempt in itertools.count():
+            await self._acquire_async(model, tokens, level)
+            try:
+                response = await create()
+            except RateLimitError as e:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._throttled(model, e, attempt))
+                continue
+            except _TRANSIENT:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            self._settle(model, tokens, response)
+            return response
+
+    def metrics(self) -> dict[str, dict]:
+        """Per model: current queue depth (total and by priority) and running counters."""
+        with self._lock:
+            return {
+                model: {
+                    "queued": len(queue.waiting),
+                    "queued_by_priority": {
+                        level: sum(1 for entry in queue.waiting if entry[0] == level)
+                        for level in sorted({entry[0] for entry in queue.waiting})
+                    },
+                    **queue.stats,
+                }
+                for model, queue in self._queues.items()
+            }
+
+
+# shared by every agent that is not given its own scheduler
+default_scheduler = Scheduler()
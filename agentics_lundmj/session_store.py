@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from .agent_history import AgentHistory
+
+
+def _apply(items: list, record: dict):
+    if record.get("reset"):
+        items.clear()
+    del items[:record.get("drop", 0)]
+    items[0:0] = record.get("prepend", [])
+    items.extend(record.get("append", []))
+
+
+class SessionJournal:
+    """
+    An append-only JSONL journal of one agent's history.
+
+    Every record describes a change relative to the previous state:
+    `{"reset": true}`, `{"drop": n}` (oldest items), `{"prepend": [...]}` and
+    `{"append": [...]}`, applied in that order. Nothing is ever rewritten in place;
+    once `compact_after` records pile up, a background thread folds them into a
+    single snapshot record and atomically swaps the file.
+    """
+
+    def __init__(self, path: str | Path, compact_after: int = 200):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compact_after = compact_after
+        self.mark = (0, 0)  # (appended, dropped) of the journaled history
+        self._lock = threading.Lock()
+        self._records = self._count_records()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._compacting = False
+
+    def _count_records(self) -> int:
+        if not self.path.exists():
+            return 0
+        with open(self.path, "rb") as f:
+            return sum(1 for _ in f)
+
+    def record(self, **record):
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._records += 1
+            if self._records > self.compact_after and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self._compact, daemon=True).start()
+
+    def replay(self) -> list[dict]:
+        """Rebuild the journaled history."""
+        with self._lock:
+            self._file.flush()
+            return self._replay(self.path.stat().st_size)
+
+    def _replay(self, size: int) -> list[dict]:
+        items = []
+        with open(self.path, "rb") as f:
+            for line in f.read(size).splitlines():
+                if line.strip():
+                    _apply(items, json.loads(line))
+        return items
+
+    def _compact(self):
+        try:
+            with self._lock:
+                self._file.flush()
+                size = self.path.stat().st_size
+            snapshot = json.dumps({"reset": True, "append": self._replay(size)}, default=str)
+            tmp = self.path.with_suffix(".compacting")
+            with open(tmp, "w", encoding="utf-8") as out:
+                out.write(snapshot + "\n")
+                with self._lock:
+                    # carry over records written while the snapshot was built
+                    with open(self.path, "rb") as f:
+                        f.seek(size)
+                        tail = f.read().decode("utf-8")
+                    out.write(tail)
+                    out.flush()
+                    os.fsync(out.fileno())
+                    self._file.close()
+                    os.replace(tmp, self.path)
+                    self._file = open(self.path, "a", encoding="utf-8")
+                    self._records = 1 + tail.count("\n")
+        finally:
+            self._compacting = False
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class SessionStore:
+    """
+    Keeps agent sessions on disk, one directory per session id, so a session can be
+    resumed by any process.
+
+    `attach(agent, session_id)` restores the agent's history (and its helper agents')
+    from their journals, if any, and from then on journals every turn.
+    """
+
+    def __init__(self, root: str | Path, compact_after: int = 200):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compact_after = compact_after
+
+    def _directory(self, session_id: str) -> Path:
+        """The session's directory; ids that would reach outside `root` are rejected."""
+        root = self.root.resolve()
+        directory = (root / session_id).resolve()
+        if directory.parent != root:
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        return directory
+
+    def attach(self, agent, session_id: str):
+        directory = self._directory(session_id)
+        agent.session_id = session_id
+        self._attach(agent, directory, "agent")
+
+    def _attach(self, agent, directory: Path, name: str):
+        if agent._journal is not None:
+            agent._journal.close()
+        journal = SessionJournal(directory / f"{name}.jsonl", self.compact_after)
+        history = AgentHistory(agent._history_limit if agent._history_limit_strict else None)
+        history.extend(journal.replay())
+        journal.mark = (history.appended, history.dropped)
+        agent._history = history
+        agent._journal = journal
+        for i, helper in enumerate(agent._helper_agents, start=1):
+            self._attach(helper, directory, f"{name}.helper{i}")
+
+    def sessions(self) -> list[str]:
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def delete(self, session_id: str):
+        shutil.rmtree(self._directory(session_id), ignore_errors=True)
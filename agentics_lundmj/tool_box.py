@@ -1,13 +1,20 @@
+import contextlib
 import inspect
+import weakref
 from types import UnionType
-from typing import Any, Callable, get_type_hints, Literal, get_origin, get_args, Union
-import copy
+from typing import Any, Callable, Iterable, get_type_hints, Literal, get_origin, get_args, Union, is_typeddict, TYPE_CHECKING
 import functools
+import json
 import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
-from openai.types.responses import FunctionToolParam
+if TYPE_CHECKING:  # importing openai is slow and only needed for the annotation
+    from openai.types.responses import FunctionToolParam
+
+from .tool_log import ToolCallLogger, tool_call_context
 
 
 def _is_optional(annotation) -> bool:
@@ -36,6 +43,20 @@ def _get_strict_json_schema_type(annotation) -> dict:
     if annotation in type_map:
         return {"type": type_map[annotation]}
 
+    if origin is list and len(args) == 1:
+        return {"type": "array", "items": _get_strict_json_schema_type(args[0])}
+
+    if is_typeddict(annotation):
+        fields = get_type_hints(annotation)
+        return {
+            "type": "object",
+            "properties": {
+                name: _get_strict_json_schema_type(ann) for name, ann in fields.items()
+            },
+            "required": list(fields),
+            "additionalProperties": False,
+        }
+
     if origin in type_map:
         return {"type": type_map[origin]}
 
@@ -48,7 +69,36 @@ def _get_strict_json_schema_type(annotation) -> dict:
     raise TypeError(f"Unsupported parameter type: {annotation}")
 
 
-def generate_function_schema(func: Callable[..., Any]) -> FunctionToolParam:
+def _schema_error(schema: dict, value: Any, path: str) -> str | None:
+    """Why `value` does not match a schema built by `_get_strict_json_schema_type`, if it does not."""
+    kind = schema.get("type")
+    if "enum" in schema and value not in schema["enum"]:
+        return f"{path} must be one of {schema['enum']}"
+    if kind == "string" and not isinstance(value, str) \
+            or kind == "boolean" and not isinstance(value, bool) \
+            or kind == "integer" and (not isinstance(value, int) or isinstance(value, bool)) \
+            or kind == "number" and (not isinstance(value, (int, float)) or isinstance(value, bool)):
+        return f"{path} must be of type {kind}"
+    if kind == "array":
+        if not isinstance(value, list):
+            return f"{path} must be an array"
+        for i, element in enumerate(value):
+            if error := _schema_error(schema["items"], element, f"{path}[{i}]"):
+                return error
+    if kind == "object":
+        if not isinstance(value, dict):
+            return f"{path} must be an object"
+        if missing := [name for name in schema["required"] if name not in value]:
+            return f"{path} is missing {', '.join(missing)}"
+        if unexpected := [name for name in value if name not in schema["properties"]]:
+            return f"{path} has unexpected {', '.join(unexpected)}"
+        for name, field in schema["properties"].items():
+            if error := _schema_error(field, value[name], f"{path}.{name}"):
+                return error
+    return None
+
+
+def generate_function_schema(func: Callable[..., Any]) -> 'FunctionToolParam':
     sig = inspect.signature(func)
     type_hints = get_type_hints(func)
 
@@ -84,98 +134,263 @@ def generate_function_schema(func: Callable[..., Any]) -> FunctionToolParam:
 TOOL_CALL_LOG_DIR = "log"
 
 class ToolBox:
-    tools: list[FunctionToolParam]
+    """
+    A registry of tools, indexed by name.
+
+    Schemas are generated once at registration and never mutated afterwards, so
+    merged tool boxes share them instead of copying. `tools` and `tools_json` are
+    built on first use and cached until the registry changes.
+    """
 
     def __init__(self, log_file: str | Path | None = None):
         self._funcs = {}
-        self.tools = []
-
-        # Handle log file configuration
-        if log_file:
-            self.log_path = Path(log_file)
-            self.log_path.parent.mkdir(parents=True, exist_ok=True)  # Ensure the directory exists
-        else:
-            self.log_path = None  # No logging if log_file is None
-
-    def tool(self, func: Callable | None = None, *, name: str | None = None):
+        self._schemas: dict[str, 'FunctionToolParam'] = {}
+        self._tools: 'list[FunctionToolParam] | None' = None
+        self._tools_json: str | None = None
+        self._serial = set()
+        self._serial_lock = threading.RLock()
+        # async tools also take a per-loop lock, since the RLock lets a loop's thread in twice
+        self._async_serial_locks = weakref.WeakKeyDictionary()  # event loop -> asyncio.Lock
+        self._cache = {}  # group -> {call key: (expires at, result)}
+        self._cache_lock = threading.Lock()
+        # bumped by invalidation, so a call that overlapped it does not cache a stale result
+        self._generations: dict[str, int] = {}
+        self._epoch = 0  # the same, for invalidating every group at once
+        self.cache_stats = {}  # tool name -> {"hits": int, "misses": int}
+        # boxes whose caches back this box's tools; merging keeps the originals' caches
+        self._cache_owners: list[ToolBox] = [self]
+
+        # tool calls are logged as JSONL by a background writer; no logging if None
+        self.log_path = Path(log_file) if log_file else None
+        self._logger = ToolCallLogger(self.log_path) if self.log_path else None
+
+    def tool(self,
+        func: Callable | None = None,
+        *,
+        name: str | None = None,
+        concurrent: bool = True,
+        cache: bool | str = False,
+        ttl: float | None = None,
+        invalidates: str | Iterable[str] = (),
+    ):
+        """
+        Register `func` as a tool. Usable as `@tool_box.tool` or `@tool_box.tool(...)`.
+
+        Tools registered with `concurrent=False` are never run at the same time as
+        another non-concurrent tool from this tool box (e.g. calendar mutations).
+        Async functions are registered as async tools; agents await them directly.
+
+        `cache` memoizes results by call arguments for `ttl` seconds (forever if None).
+        `cache=True` gives the tool its own cache group; a string names a group that
+        several tools share. `invalidates` names the groups flushed whenever this
+        tool runs, e.g. a write tool invalidating the reads it affects.
+        """
         # support both decorator and direct-call forms
         if func is None:
-            return lambda f: self.tool(f, name=name)
-
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            entry = {
-                "timestamp": ts,
-                "tool": func.__name__,
-                "args": args,
-                "kwargs": kwargs,
-            }
-            try:
-                result = func(*args, **kwargs)
-                entry["result"] = result
-            except Exception as e:
-                entry["error"] = str(e)
-                if self.log_path:
-                    log_message = (
-                        f"[{entry['timestamp']}] Tool: {entry['tool']}\n"
-                        f"  Args: {entry['args']}\n"
-                        f"  Kwargs: {entry['kwargs']}\n"
-                        f"  Error: {entry['error']}\n"
-                        "----------------------------------------\n"
-                    )
-                    with open(self.log_path, "a") as f:
-                        f.write(log_message)
-                raise
-            if self.log_path:
-                log_message = (
-                    f"[{entry['timestamp']}] Tool: {entry['tool']}\n"
-                    f"  Args: {entry['args']}\n"
-                    f"  Kwargs: {entry['kwargs']}\n"
-                    f"  Result: {entry['result']}\n"
-                    "----------------------------------------\n"
-                )
-                with open(self.log_path, "a") as f:
-                    f.write(log_message)
-            return entry.get("result")
+            return lambda f: self.tool(
+                f, name=name, concurrent=concurrent,
+                cache=cache, ttl=ttl, invalidates=invalidates,
+            )
 
         # register under an explicit name if provided, else use the function's name
         reg_name = name or func.__name__
+        group = reg_name if cache is True else cache or None
+        invalidated = (invalidates,) if isinstance(invalidates, str) else tuple(invalidates)
+        if group:
+            self.cache_stats[reg_name] = {"hits": 0, "misses": 0}
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if group:
+                    key = self._cache_key(reg_name, args, kwargs)
+                    hit, result, generation = self._cache_get(group, reg_name, key)
+                    if hit:
+                        return result
+                entry, started = self._new_log_entry(reg_name, args, kwargs), time.perf_counter()
+                try:
+                    if concurrent:
+                        entry["result"] = await func(*args, **kwargs)
+                    else:
+                        async with self._serial_async():
+                            entry["result"] = await func(*args, **kwargs)
+                except Exception as e:
+                    entry["error"] = str(e)
+                    self._log(entry, started)
+                    raise
+                finally:
+                    if invalidated:  # invalidate() with no groups would flush everything
+                        self.invalidate(*invalidated)
+                self._log(entry, started)
+                if group:
+                    self._cache_put(group, key, entry["result"], ttl, generation)
+                return entry["result"]
+        else:
+            def logged_call(*args, **kwargs):
+                entry, started = self._new_log_entry(reg_name, args, kwargs), time.perf_counter()
+                try:
+                    entry["result"] = func(*args, **kwargs)
+                except Exception as e:
+                    entry["error"] = str(e)
+                    self._log(entry, started)
+                    raise
+                finally:
+                    if invalidated:  # invalidate() with no groups would flush everything
+                        self.invalidate(*invalidated)
+                self._log(entry, started)
+                return entry["result"]
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if group:
+                    key = self._cache_key(reg_name, args, kwargs)
+                    hit, result, generation = self._cache_get(group, reg_name, key)
+                    if hit:
+                        return result
+                if concurrent:
+                    result = logged_call(*args, **kwargs)
+                else:
+                    with self._serial_lock:
+                        result = logged_call(*args, **kwargs)
+                if group:
+                    self._cache_put(group, key, result, ttl, generation)
+                return result
+
         wrapper.__name__ = reg_name
 
         self._funcs[reg_name] = wrapper
+        if not concurrent:
+            self._serial.add(reg_name)
 
         # generate schema from original func but override the name so it is unique
         schema = generate_function_schema(func)
         schema["name"] = reg_name
-        self.tools.append(copy.deepcopy(schema))
+        self._schemas.pop(reg_name, None)  # re-registering moves the tool to the end
+        self._schemas[reg_name] = schema
+        self._changed()
 
         return wrapper
 
+    @contextlib.asynccontextmanager
+    async def _serial_async(self):
+        """Hold the serial lock from async code without blocking the event loop."""
+        import asyncio  # only async tools need it; keeps it off the CLI's import path
+        loop = asyncio.get_running_loop()
+        with self._cache_lock:
+            lock = self._async_serial_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            # shared with sync tools and with other threads' loops, so it is polled
+            while not self._serial_lock.acquire(blocking=False):
+                await asyncio.sleep(0.005)
+            try:
+                yield
+            finally:
+                self._serial_lock.release()
+
+    @property
+    def tools(self) -> 'list[FunctionToolParam]':
+        """The tool schemas in registration order. Shared; do not mutate."""
+        if self._tools is None:
+            self._tools = list(self._schemas.values())
+        return self._tools
+
+    @property
+    def tools_json(self) -> str:
+        """`tools` as canonical JSON, e.g. for hashing requests."""
+        if self._tools_json is None:
+            self._tools_json = json.dumps(self.tools, sort_keys=True, separators=(",", ":"))
+        return self._tools_json
+
+    def _changed(self):
+        self._tools = self._tools_json = None
+
+    @staticmethod
+    def _cache_key(tool_name: str, args: tuple, kwargs: dict) -> str:
+        return tool_name + json.dumps([args, kwargs], sort_keys=True, default=str)
+
+    def _cache_get(self, group: str, tool_name: str, key: str) -> tuple[bool, Any, tuple]:
+        """Look up a result; on a miss, also return the generation to pass to `_cache_put`."""
+        stats = self.cache_stats[tool_name]
+        with self._cache_lock:
+            entry = self._cache.get(group, {}).get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                stats["hits"] += 1
+                return True, entry[1], ()
+            stats["misses"] += 1
+            return False, None, (self._epoch, self._generations.get(group, 0))
+
+    def _cache_put(self, group: str, key: str, result: Any, ttl: float | None, generation: tuple):
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._cache_lock:
+            if generation != (self._epoch, self._generations.get(group, 0)):
+                return  # invalidated while the tool ran; the result may predate the change
+            self._cache.setdefault(group, {})[key] = (expires, result)
+
+    def invalidate(self, *groups: str):
+        """Drop cached results for the given cache groups (all groups if none given)."""
+        for owner in self._cache_owners:
+            owner._invalidate_own(groups)
+
+    def _invalidate_own(self, groups: tuple[str, ...]):
+        with self._cache_lock:
+            if not groups:
+                self._cache.clear()
+                self._epoch += 1
+            for group in groups:
+                self._cache.pop(group, None)
+                self._generations[group] = self._generations.get(group, 0) + 1
+
+    def _new_log_entry(self, tool_name: str, args: tuple, kwargs: dict) -> dict:
+        return {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "tool": tool_name,
+            **tool_call_context.get(),
+            "args": args,
+            "kwargs": kwargs,
+        }
+
+    def _log(self, entry: dict, started: float):
+        if self._logger:
+            entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            self._logger.record(**entry)
+
     def get_tool_function(self, tool_name: str) -> Callable | None:
         return self._funcs.get(tool_name)
 
+    def argument_errors(self, tool_name: str, arguments: str) -> str | None:
+        """Check a function call's JSON arguments against the tool's schema without running it."""
+        if (schema := self._schemas.get(tool_name)) is None:
+            return f"unknown tool {tool_name}"
+        try:
+            value = json.loads(arguments)
+        except json.JSONDecodeError as e:
+            return f"arguments are not valid JSON: {e}"
+        return _schema_error(schema["parameters"], value, "arguments")
+
+    def is_concurrent(self, tool_name: str) -> bool:
+        return tool_name not in self._serial
+
     def __or__(self, other: "ToolBox | None") -> "ToolBox":
         if other is None:
-            return copy.deepcopy(self)
+            return self | ToolBox()
         if not isinstance(other, ToolBox):
             raise TypeError("Operand must be a ToolBox or None")
 
         merged = ToolBox()
-        # start with a shallow copy of left-hand tools and schemas
-        for name, wrapper in self._funcs.items():
-            merged._funcs[name] = wrapper
-        for schema in self.tools:
-            merged.tools.append(copy.deepcopy(schema))
-
-        # overlay with right-hand tools (overwrite on conflict)
-        for schema in other.tools:
-            name = schema["name"]
-            merged._funcs[name] = other._funcs[name]
-            # remove any existing schema with the same name
-            merged.tools = [s for s in merged.tools if s["name"] != name]
-            merged.tools.append(copy.deepcopy(schema))
-
+        # left-hand tools keep their order; right-hand tools win conflicts and go last
+        merged._schemas = {
+            name: schema for name, schema in self._schemas.items()
+            if name not in other._schemas
+        }
+        merged._schemas.update(other._schemas)
+        merged._funcs = {**self._funcs, **other._funcs}
+        merged._serial = (self._serial - other._schemas.keys()) | other._serial
+        merged.cache_stats = {
+            name: stats for name, stats in self.cache_stats.items()
+            if name not in other._schemas
+        }
+        merged.cache_stats.update(other.cache_stats)
+        merged._cache_owners = _unique([merged, *self._cache_owners, *other._cache_owners])
         return merged
 
     def __ior__(self, other: "ToolBox | None") -> "ToolBox":
@@ -183,5 +398,13 @@ class ToolBox:
             return self
         merged = self | other
         self._funcs = merged._funcs
-        self.tools = merged.tools
+        self._schemas = merged._schemas
+        self._serial = merged._serial
+        self.cache_stats = merged.cache_stats
+        self._cache_owners = _unique([self, *self._cache_owners, *other._cache_owners])
+        self._changed()
         return self
+
+
+def _unique(boxes: list[ToolBox]) -> list[ToolBox]:
+    return list({id(box): box for box in boxes}.values())
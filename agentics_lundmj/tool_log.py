@@ -0,0 +1,156 @@
+import argparse
+import atexit
+import json
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# who is calling a tool right now; agents set this around every tool call
+tool_call_context: ContextVar[dict] = ContextVar("tool_call_context", default={})
+
+
+class ToolCallLogger:
+    """
+    A buffered JSONL log of tool calls, written by a background thread.
+
+    `record` only enqueues; the writer thread flushes queued records in batches
+    every `flush_interval` seconds. Once the file reaches `max_bytes` it is rotated
+    to `<name>.1`, `<name>.2`, ... keeping `backups` old files.
+    """
+
+    def __init__(self, path: str | Path, max_bytes: int = 5_000_000, backups: int = 3,
+                 flush_interval: float = 1.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def record(self, **record):
+        if self._thread is None:
+            self._start()
+        self._queue.put(record)
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # keep collecting for a moment so bursts of calls are written together
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(record for record in batch if record is not None)
+            if batch[-1] is None:
+                return
+
+    def _write(self, records: Iterable[dict]):
+        lines = "".join(
+            json.dumps(record, separators=(",", ":"), default=str) + "\n" for record in records
+        )
+        if not lines:
+            return
+        if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def close(self):
+        """Flush everything queued so far and stop the writer thread."""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+def read_records(path: str | Path) -> Iterator[dict]:
+    """Yield the records of a log and its rotated files, oldest first."""
+    path = Path(path)
+    rotated = sorted(
+        path.parent.glob(f"{path.name}.*"),
+        key=lambda p: int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0,
+        reverse=True,
+    )
+    for file in [*rotated, path]:
+        if not file.exists():
+            continue
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def summarize(records: Iterable[dict], since: datetime | None = None) -> dict[str, dict]:
+    """Aggregate call count, error rate and latency percentiles per tool."""
+    durations: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for record in records:
+        if since and datetime.fromisoformat(record["timestamp"]) < since:
+            continue
+        tool = record["tool"]
+        durations.setdefault(tool, []).append(record["duration_ms"])
+        errors[tool] = errors.get(tool, 0) + ("error" in record)
+
+    summary = {}
+    for tool, times in durations.items():
+        times.sort()
+        summary[tool] = {
+            "calls": len(times),
+            "error_rate": errors[tool] / len(times),
+            "mean_ms": sum(times) / len(times),
+            "p50_ms": times[len(times) // 2],
+            "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+            "max_ms": times[-1],
+        }
+    return summary
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Summarize tool call logs per tool.")
+    parser.add_argument("log_file", help="Path to a JSONL tool call log")
+    parser.add_argument("--since", type=datetime.fromisoformat,
+                        help="Only count calls at or after this ISO timestamp")
+    parser.add_argument("--agent", help="Only count calls made by this agent")
+    args = parser.parse_args(argv)
+
+    records = read_records(args.log_file)
+    if args.agent:
+        records = (r for r in records if r.get("agent") == args.agent)
+    summary = summarize(records, since=args.since)
+
+    print(f"{'tool':<32} {'calls':>7} {'errors':>7} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}")
+    for tool, s in sorted(summary.items(), key=lambda kv: -kv[1]["calls"]):
+        print(
+            f"{tool:<32} {s['calls']:>7} {s['error_rate']:>7.1%} {s['mean_ms']:>7.1f}ms"
+            f" {s['p50_ms']:>7.1f}ms {s['p95_ms']:>7.1f}ms {s['max_ms']:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
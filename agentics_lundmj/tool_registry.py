@@ -0,0 +1,94 @@
+import importlib
+import inspect
+from typing import Callable
+
+from .tool_box import ToolBox
+
+# installed packages can publish tool boxes under this entry point group, e.g.
+# [project.entry-points."agentics_lundmj.tool_boxes"] calendar = "my_tools:calendar_tool_box"
+ENTRY_POINT_GROUP = "agentics_lundmj.tool_boxes"
+
+_registry: dict[str, str | Callable[[], ToolBox]] = {}
+_resolved: dict[str, ToolBox] = {}
+
+
+def register_tool_box(name: str, target: str | Callable[[], ToolBox]):
+    """
+    Make a tool box available by `name` without importing it yet.
+
+    `target` is a `"module:attribute"` path (to a tool box or a function returning
+    one) or such a function itself; it is only loaded when the name is first resolved.
+    """
+    _registry[name] = target
+    _resolved.pop(name, None)
+
+
+def resolve_tool_box(spec: str, default_module: str | None = None) -> ToolBox:
+    """
+    Find a tool box, importing only the module that defines it. `spec` may be:
+    1. a name given to `register_tool_box`,
+    2. a `"module:attribute"` path,
+    3. the name of an entry point in the `agentics_lundmj.tool_boxes` group,
+    4. an attribute of `default_module`.
+
+    Raises `LookupError` if nothing matches.
+    """
+    if spec in _resolved:
+        return _resolved[spec]
+
+    if spec in _registry:
+        target = _registry[spec]
+    elif ":" in spec:
+        target = spec
+    elif matches := _entry_points(name=spec):
+        target = next(iter(matches)).load
+    elif default_module:
+        target = f"{default_module}:{spec}"
+    else:
+        raise LookupError(f"Unknown tool box: {spec}")
+
+    tool_box = _load(target)
+    if not isinstance(tool_box, ToolBox):
+        raise LookupError(f"{spec} does not name a ToolBox")
+    _resolved[spec] = tool_box
+    return tool_box
+
+
+def _entry_points(**match):
+    # importlib.metadata scans every installed package, so it is only imported on a miss
+    from importlib.metadata import entry_points
+    return entry_points(group=ENTRY_POINT_GROUP, **match)
+
+
+def _load(target: str | Callable):
+    if callable(target):
+        loaded = target()
+    else:
+        module_name, _, attribute = target.partition(":")
+        try:
+            loaded = getattr(importlib.import_module(module_name), attribute)
+        except (ImportError, AttributeError) as e:
+            raise LookupError(f"Cannot load tool box {target}: {e}") from e
+    # a path or entry point may name a factory rather than the tool box itself
+    if callable(loaded) and not isinstance(loaded, ToolBox) and _takes_no_arguments(loaded):
+        loaded = loaded()
+    return loaded
+
+
+def _takes_no_arguments(function: Callable) -> bool:
+    try:
+        return not any(
+            p.default is p.empty and p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+            for p in inspect.signature(function).parameters.values()
+        )
+    except (TypeError, ValueError):  # no signature, e.g. some builtins
+        return False
+
+
+def available_tool_boxes(default_module: str | None = None) -> list[str]:
+    """Names that `resolve_tool_box` accepts without a module path."""
+    names = set(_registry) | {ep.name for ep in _entry_points()}
+    if default_module:
+        module = importlib.import_module(default_module)
+        names |= {name for name, value in vars(module).items() if isinstance(value, ToolBox)}
+    return sorted(names)
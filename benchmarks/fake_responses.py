@@ -0,0 +1,158 @@
+"""
+An in-process stand-in for the OpenAI Responses API, for offline benchmarks.
+
+`FakeClient(script, latency)` answers `client.responses.create(...)` from a script.
+A script is a list of steps; each step is the output of one model response, given
+as plain dicts (see `message` and `function_call`). A new user message starts the
+script from its first step. A request that ends in tool outputs gets the step after
+the one that made those calls. The fake is stateless per request, so forks and
+pooled helpers can share one client.
+
+`FakeClient(script, stateful=True)` also stores every response, like the real API
+does with `store=True`, and rebuilds the context of a request that names a
+`previous_response_id`. `contexts` records how many items each request's full
+context held, and `expire()` forgets the stored responses so the agent's fallback
+to a full resend can be exercised.
+"""
+import asyncio
+import importlib
+import itertools
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from openai import BadRequestError
+from openai._constants import DEFAULT_CONNECTION_LIMITS
+from openai.types.responses import Response
+
+# the SDK's own httpx flavour, whichever it is built on
+_httpx = importlib.import_module(type(DEFAULT_CONNECTION_LIMITS).__module__.split(".")[0])
+
+_ids = itertools.count()
+
+
+def message(text: str) -> dict:
+    return {
+        "type": "message", "id": f"msg_{next(_ids)}", "role": "assistant",
+        "status": "completed",
+        "content": [{"type": "output_text", "text": text, "annotations": []}],
+    }
+
+
+def function_call(name: str, **arguments) -> dict:
+    return {
+        "type": "function_call", "id": f"fc_{next(_ids)}", "call_id": "",
+        "name": name, "arguments": json.dumps(arguments), "status": "completed",
+    }
+
+
+class FakeResponses:
+    def __init__(self, script: list[list[dict]], latency: float = 0.0):
+        if not script:
+            raise ValueError("script needs at least one step")
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        # responses are built once; agents only read them
+        self._steps = [self._build(i, output) for i, output in enumerate(script)]
+
+    @staticmethod
+    def _build(step: int, output: list[dict]) -> Response:
+        output = [
+            {**item, "call_id": f"call_{step}_{n}"} if item["type"] == "function_call" else item
+            for n, item in enumerate(output)
+        ]
+        return Response.model_validate({
+            "id": f"resp_{step}", "created_at": 0, "model": "fake", "object": "response",
+            "output": output, "parallel_tool_calls": True, "tool_choice": "auto", "tools": [],
+            "usage": {
+                "input_tokens": 0, "output_tokens": 0, "total_tokens": 0,
+                "input_tokens_details": {"cached_tokens": 0, "cache_write_tokens": 0},
+                "output_tokens_details": {"reasoning_tokens": 0},
+            },
+        })
+
+    def _next_step(self, request: dict) -> Response:
+        with self._lock:
+            self.requests += 1
+        last = request["input"][-1]
+        step = 0
+        if isinstance(last, dict) and last.get("type") == "function_call_output":
+            step = int(last["call_id"].split("_")[1]) + 1
+        return self._steps[min(step, len(self._steps) - 1)]
+
+    def create(self, **request):
+        if self.latency:
+            time.sleep(self.latency)
+        response = self._next_step(request)
+        if request.get("stream"):
+            return _stream(response)
+        return response
+
+
+class AsyncFakeResponses(FakeResponses):
+    async def create(self, **request):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._next_step(request)
+
+
+def _stream(response: Response):
+    for index, item in enumerate(response.output):
+        if item.type == "message":
+            for word in item.content[0].text.split(" "):
+                yield SimpleNamespace(type="response.output_text.delta", delta=word + " ", output_index=index)
+        elif item.type == "function_call":
+            yield SimpleNamespace(type="response.function_call_arguments.delta", delta=item.arguments, output_index=index)
+            item = item.model_copy()
+        yield SimpleNamespace(type="response.output_item.done", item=item, output_index=index)
+    yield SimpleNamespace(type="response.completed", response=response)
+
+
+class StatefulFakeResponses(FakeResponses):
+    def __init__(self, script: list[list[dict]], latency: float = 0.0):
+        super().__init__(script, latency)
+        self.stored: dict[str, list] = {}  # response id -> its full context and output
+        self.contexts: list[int] = []
+
+    def expire(self):
+        with self._lock:
+            self.stored.clear()
+
+    def create(self, **request):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            context = list(request["input"])
+            if (previous := request.get("previous_response_id")) is not None:
+                if previous not in self.stored:
+                    raise _not_found(previous)
+                context = self.stored[previous] + context
+            self.contexts.append(len(context))
+        response = self._next_step({**request, "input": context})
+        with self._lock:
+            response = response.model_copy(update={"id": f"resp_{self.requests}"})
+            self.stored[response.id] = context + list(response.output)
+        if request.get("stream"):
+            return _stream(response)
+        return response
+
+
+def _not_found(response_id: str) -> BadRequestError:
+    message = f"Previous response with id '{response_id}' not found."
+    return BadRequestError(
+        message,
+        response=_httpx.Response(400, request=_httpx.Request("POST", "https://fake/v1/responses")),
+        body={"message": message, "param": "previous_response_id", "code": "previous_response_not_found"},
+    )
+
+
+class FakeClient:
+    def __init__(self, script: list[list[dict]], latency: float = 0.0, stateful: bool = False):
+        self.responses = (StatefulFakeResponses if stateful else FakeResponses)(script, latency)
+
+
+class AsyncFakeClient:
+    def __init__(self, script: list[list[dict]], latency: float = 0.0):
+        self.responses = AsyncFakeResponses(script, latency)
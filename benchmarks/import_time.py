@@ -0,0 +1,71 @@
+"""
+Cold-start times of the command-line entry points.
+
+Each command runs in a fresh interpreter several times and the median wall time is
+reported. `--compare <git revision>` measures the same commands in a temporary
+worktree of that revision, side by side with the current tree.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --compare HEAD~1 -n 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = {
+    "main.py --help": ["main.py", "--help"],
+    "import main": ["-c", "import main"],
+    "import tools": ["-c", "import tools"],
+    "import agent": ["-c", "import agentics_lundmj.agent"],
+}
+
+
+def measure(tree: Path, args: list[str], runs: int) -> float:
+    """Median milliseconds to run `python <args>` from `tree`."""
+    # the tree's own modules must win over the installed (editable) package
+    env = {**os.environ, "PYTHONPATH": str(tree), "PYTHONDONTWRITEBYTECODE": "1"}
+    subprocess.run([sys.executable, *args], cwd=tree, env=env, capture_output=True)  # warm the caches
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=tree, env=env, capture_output=True, check=True)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure CLI cold-start time.")
+    parser.add_argument("-n", "--runs", type=int, default=10, help="runs per command")
+    parser.add_argument("--compare", metavar="REV", help="also measure this git revision")
+    args = parser.parse_args(argv)
+
+    columns = {"current": ROOT}
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.compare:
+            worktree = Path(scratch) / "tree"
+            subprocess.run(
+                ["git", "worktree", "add", "--detach", str(worktree), args.compare],
+                cwd=ROOT, check=True, capture_output=True,
+            )
+            columns = {args.compare: worktree, **columns}
+        try:
+            print(f"{'command':<18}" + "".join(f"{name:>14}" for name in columns))
+            for label, command in COMMANDS.items():
+                row = [measure(tree, command, args.runs) for tree in columns.values()]
+                print(f"{label:<18}" + "".join(f"{ms:>12.0f}ms" for ms in row))
+        finally:
+            if args.compare:
+                subprocess.run(["git", "worktree", "remove", "--force", str(worktree)],
+                               cwd=ROOT, capture_output=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
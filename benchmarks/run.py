@@ -0,0 +1,318 @@
+"""
+Offline benchmarks of the framework's own overhead.
+
+Every scenario runs against `fake_responses.FakeClient`, so no network is used and
+the numbers reflect the framework itself: the chat loop, tool dispatch, ToolBox
+merging and history trimming. Each run appends its results to `results.jsonl` and
+compares each scenario's overhead with the median of its last five runs.
+
+    python -m benchmarks.run                      # all scenarios
+    python -m benchmarks.run -k delegator -k tool
+    python -m benchmarks.run --latency 0.01       # add simulated model latency
+    python -m benchmarks.run --fail-on-regression
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from agentics_lundmj.agent import Agent, AgentSequence
+from agentics_lundmj.async_agent import AsyncAgent
+from agentics_lundmj.tool_box import ToolBox
+
+from .fake_responses import AsyncFakeClient, FakeClient, function_call, message
+
+ROOT = Path(__file__).resolve().parent.parent
+PROMPTS = ROOT / "system_prompts"
+RESULTS = Path(__file__).resolve().parent / "results.jsonl"
+
+
+class Scenario:
+    """
+    A benchmark: `setup(latency)` builds the objects and returns `(op, requests)`,
+    where `op()` performs one operation and `requests()` reads how many fake
+    requests have been made so far.
+    """
+
+    def __init__(self, name: str, setup: Callable, ops: int):
+        self.name = name
+        self.setup = setup
+        self.ops = ops
+
+
+def _named_tool_box(*names: str) -> ToolBox:
+    tool_box = ToolBox()
+    for name in names:
+        def tool(city: str, days: int) -> str:
+            """Look up a forecast."""
+            return f"{city}: sunny for {days} days"
+        tool_box.tool(tool, name=name)
+    return tool_box
+
+
+def _tool_box(prefix: str = "", count: int = 3) -> ToolBox:
+    return _named_tool_box(*(f"{prefix}tool_{i}" for i in range(count)))
+
+
+def _agent(prompt: str, script: list, latency: float, **kwargs) -> tuple[Agent, FakeClient]:
+    agent = Agent(PROMPTS / prompt, **kwargs)
+    agent.client = FakeClient(script, latency)
+    return agent, agent.client
+
+
+def agent_plain_turn(latency: float):
+    agent, client = _agent("assistant.md", [[message("Hello there!")]], latency)
+    return lambda: agent.chat_once("Hi"), lambda: client.responses.requests
+
+
+def agent_tool_loop(latency: float, workers: int = 1):
+    script = [
+        [function_call(f"tool_{i}", city="Provo", days=i) for i in range(3)],
+        [function_call("tool_0", city="Orem", days=1)],
+        [message("Done.")],
+    ]
+    agent, client = _agent(
+        "assistant.md", script, latency, tool_box=_tool_box(), max_tool_workers=workers,
+    )
+    return lambda: agent.chat_once("Plan my week"), lambda: client.responses.requests
+
+
+def agent_tool_loop_parallel(latency: float):
+    return agent_tool_loop(latency, workers=4)
+
+
+def agent_stream(latency: float):
+    script = [[function_call("tool_0", city="Provo", days=2)], [message("It will be sunny all week.")]]
+    agent, client = _agent("assistant.md", script, latency, tool_box=_tool_box())
+    return lambda: "".join(agent.chat_stream("Weather?")), lambda: client.responses.requests
+
+
+def agent_trimmed_history(latency: float):
+    # a long-lived session where every turn trims by count and by token budget
+    agent, client = _agent(
+        "assistant.md", [[message("Noted. " * 50)]], latency,
+        history_limit=200, history_token_budget=4000,
+    )
+    return lambda: agent.chat_once("Remember this. " * 20), lambda: client.responses.requests
+
+
+def agent_stateful(latency: float):
+    # chained requests under a history limit, with the server forgetting the chain
+    # now and then so the full-resend fallback runs too
+    script = [[function_call("tool_0", city="Provo", days=2)], [message("Sunny.")]]
+    agent = Agent(PROMPTS / "assistant.md", tool_box=_tool_box(), history_limit=8, stateful=True)
+    agent.client = FakeClient(script, latency, stateful=True)
+    turns = itertools.count()
+
+    def op():
+        if next(turns) % 10 == 9:
+            agent.client.responses.expire()
+        agent.chat_once("Weather?")
+    return op, lambda: agent.client.responses.requests
+
+
+def async_agent_tool_loop(latency: float):
+    script = [
+        [function_call(f"tool_{i}", city="Provo", days=i) for i in range(3)],
+        [message("Done.")],
+    ]
+    agent = AsyncAgent(PROMPTS / "assistant.md", tool_box=_tool_box(), max_tool_workers=4)
+    agent.client = AsyncFakeClient(script, latency)
+
+    async def many():
+        await asyncio.gather(*(agent.fork().chat_once_async("Plan") for _ in range(10)))
+    return lambda: asyncio.run(many()), lambda: agent.client.responses.requests
+
+
+def sequence_map(latency: float):
+    stages = [
+        _agent(prompt, [[message(f"{prompt} output")]], latency)
+        for prompt in ("property_shopper.md", "property_grader.md", "product_describer.md")
+    ]
+    sequence = AgentSequence(*(agent for agent, _ in stages))
+    inputs = [f"listing {i}" for i in range(8)]
+    return (
+        lambda: sequence.map(inputs, concurrency=4, isolate_history=True),
+        lambda: sum(client.responses.requests for _, client in stages),
+    )
+
+
+def delegator(latency: float):
+    # the topology from delegator.py, with stand-in tools
+    email_agent, email_client = _agent(
+        "email_assistant.md",
+        [[function_call("send_email", city="to@example.com", days=1)], [message("Sent.")]],
+        latency, history_limit=6, tool_box=_named_tool_box("send_email"),
+        description="An assistant that can send emails to any address.",
+    )
+    calendar_agent, calendar_client = _agent(
+        "calendar_assistant.md",
+        [[function_call("get_events_between", city="Provo", days=7),
+          function_call("create_calendar_event", city="Provo", days=1)], [message("Booked.")]],
+        latency, history_limit=6, max_tool_workers=4,
+        tool_box=_named_tool_box("get_events_between", "create_calendar_event"),
+        description="An assistant that can manage a calendar.",
+    )
+    delegator_agent = Agent(
+        PROMPTS / "assistant_delegator.md", 20,
+        helper_agents=[email_agent, calendar_agent],
+        max_tool_workers=4, helper_pool_size=3,
+        description="An assistant that delegates tasks to other agents.",
+    )
+    email_tool, calendar_tool = (schema["name"] for schema in delegator_agent._tool_box.tools)
+    delegator_agent.client = FakeClient([
+        [function_call(calendar_tool, msg="Book lunch Friday"),
+         function_call(email_tool, msg="Tell Sam about lunch")],
+        [message("Lunch is booked and Sam knows.")],
+    ], latency)
+    clients = (delegator_agent.client, email_client, calendar_client)
+    return (
+        lambda: delegator_agent.chat_once("Book lunch with Sam on Friday and let him know"),
+        lambda: sum(client.responses.requests for client in clients),
+    )
+
+
+def toolbox_merge(latency: float):
+    left, right = _tool_box("left_", 100), _tool_box("right_", 100)
+
+    def merge():
+        merged = left | right
+        merged |= _tool_box("extra_", 5)
+        return merged.tools
+    return merge, lambda: 0
+
+
+SCENARIOS = [
+    Scenario("agent_plain_turn", agent_plain_turn, 2000),
+    Scenario("agent_tool_loop", agent_tool_loop, 500),
+    Scenario("agent_tool_loop_parallel", agent_tool_loop_parallel, 300),
+    Scenario("agent_stream", agent_stream, 1000),
+    Scenario("agent_trimmed_history", agent_trimmed_history, 1000),
+    Scenario("agent_stateful", agent_stateful, 500),
+    Scenario("async_agent_tool_loop", async_agent_tool_loop, 100),
+    Scenario("sequence_map", sequence_map, 50),
+    Scenario("delegator", delegator, 200),
+    Scenario("toolbox_merge", toolbox_merge, 500),
+]
+
+
+def run_scenario(scenario: Scenario, latency: float, scale: float) -> dict:
+    ops = max(1, int(scenario.ops * scale))
+
+    # timing run
+    op, requests = scenario.setup(latency)
+    op()  # warm up
+    before = requests()
+    start = time.perf_counter()
+    for _ in range(ops):
+        op()
+    elapsed = time.perf_counter() - start
+    per_op = elapsed / ops
+    requests_per_op = (requests() - before) / ops
+
+    # memory run, separate so tracing does not skew the timings
+    tracemalloc.start()
+    op, _ = scenario.setup(latency)
+    baseline, _ = tracemalloc.get_traced_memory()
+    for _ in range(max(1, ops // 10)):
+        op()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "scenario": scenario.name,
+        "ops": ops,
+        "ops_per_sec": 1 / per_op,
+        # wall time per operation minus the simulated model latency
+        "overhead_us": max(per_op - requests_per_op * latency, 0) * 1e6,
+        "requests_per_op": requests_per_op,
+        "peak_kib": (peak - baseline) / 1024,
+        "retained_kib": (current - baseline) / 1024,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _baselines(path: Path, latency: float, window: int = 5) -> dict[str, float]:
+    """The median overhead of each scenario's last `window` runs at this latency."""
+    history: dict[str, list[float]] = {}
+    if path.exists():
+        with open(path) as f:
+            for line in f:
+                result = json.loads(line)
+                if result.get("latency") == latency:
+                    history.setdefault(result["scenario"], []).append(result["overhead_us"])
+    return {name: statistics.median(runs[-window:]) for name, runs in history.items()}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline benchmarks.")
+    parser.add_argument("-k", dest="patterns", action="append", default=[],
+                        help="Only run scenarios whose name contains this (repeatable)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated model latency per request, in seconds")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply every scenario's operation count")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Flag a regression when overhead grows by more than this fraction")
+    parser.add_argument("--results", type=Path, default=RESULTS)
+    parser.add_argument("--no-save", action="store_true", help="Do not append to the results file")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    scenarios = [
+        s for s in SCENARIOS
+        if not args.patterns or any(p in s.name for p in args.patterns)
+    ]
+    baselines = _baselines(args.results, args.latency)
+    run_info = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "latency": args.latency,
+    }
+
+    regressions = []
+    print(f"{'scenario':<28} {'ops/sec':>10} {'overhead':>12} {'peak mem':>10} {'vs base':>9}")
+    for scenario in scenarios:
+        result = run_scenario(scenario, args.latency, args.scale)
+        change = ""
+        if baseline := baselines.get(scenario.name):
+            ratio = result["overhead_us"] / baseline - 1
+            change = f"{ratio:+.1%}"
+            if ratio > args.threshold:
+                regressions.append(scenario.name)
+                change += " !"
+        print(
+            f"{scenario.name:<28} {result['ops_per_sec']:>10.1f} "
+            f"{result['overhead_us']:>10.1f}us {result['peak_kib']:>8.1f}KiB {change:>9}"
+        )
+        if not args.no_save:
+            with open(args.results, "a") as f:
+                f.write(json.dumps({**run_info, **result}) + "\n")
+
+    if regressions:
+        print(f"\nRegressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,156 @@
+import bisect
+import threading
+import time
+from datetime import date, datetime, timedelta, tzinfo, timezone
+from typing import Any, Callable
+
+
+def _is_gone(error: Exception) -> bool:
+    # HttpError 410: the sync token expired and a full sync is required
+    return getattr(getattr(error, "resp", None), "status", None) == 410
+
+
+class CalendarMirror:
+    """
+    An in-memory copy of one Google Calendar, kept current with incremental sync.
+
+    The first `sync()` lists every event and keeps the `nextSyncToken`; later syncs
+    only fetch what changed since then (falling back to a full listing if the
+    token expires). Reads are answered from a start-time index without a network
+    round trip. Writes made elsewhere in the process should be reported with
+    `apply()` / `remove()` so the mirror reflects them immediately.
+
+    `service_factory` returns a Calendar API service and `execute` runs a request;
+    both can be replaced with fakes for testing.
+    """
+
+    def __init__(self,
+        service_factory: Callable[[], Any],
+        execute: Callable[[Any], dict] = lambda request: request.execute(),
+        calendar_id: str = "primary",
+        tz: tzinfo = timezone.utc,
+        max_age: float = 30,
+    ):
+        self._service_factory = service_factory
+        self._execute = execute
+        self.calendar_id = calendar_id
+        self.tz = tz
+        self.max_age = max_age
+        self._events: dict[str, dict] = {}
+        self._spans: dict[str, tuple[datetime, datetime]] = {}
+        self._index: list[tuple[datetime, str]] = []  # sorted by start time
+        self._max_duration = timedelta(0)
+        self._sync_token: str | None = None
+        self._synced_at: float | None = None
+        self._lock = threading.RLock()
+        self._poller: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def sync(self):
+        """Fetch changes since the last sync, or every event on the first call."""
+        with self._lock:
+            try:
+                self._sync_pages()
+            except Exception as e:
+                if not _is_gone(e):
+                    raise
+                self._clear()
+                self._sync_pages()
+            self._synced_at = time.monotonic()
+
+    def ensure_fresh(self):
+        """Sync if the mirror has never synced or is older than `max_age` seconds."""
+        with self._lock:
+            if self._synced_at is None or time.monotonic() - self._synced_at > self.max_age:
+                self.sync()
+
+    def start(self, interval: float | None = None):
+        """Keep the mirror fresh from a background thread (every `max_age / 2` by default)."""
+        if self._poller is None:
+            interval = interval or self.max_age / 2
+            self._poller = threading.Thread(target=self._poll, args=(interval,), daemon=True)
+            self._poller.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def apply(self, event: dict):
+        """Insert or update an event (a cancelled event is removed)."""
+        with self._lock:
+            self._unindex(event["id"])
+            if event.get("status") == "cancelled":
+                return
+            start, end = self._span(event)
+            self._events[event["id"]] = event
+            self._spans[event["id"]] = (start, end)
+            bisect.insort(self._index, (start, event["id"]))
+            self._max_duration = max(self._max_duration, end - start)
+
+    def remove(self, event_id: str):
+        with self._lock:
+            self._unindex(event_id)
+
+    def events_between(self, start: datetime, end: datetime) -> list[dict]:
+        """Return events overlapping [start, end), ordered by start time."""
+        with self._lock:
+            lo = bisect.bisect_left(self._index, (start - self._max_duration, ""))
+            hi = bisect.bisect_left(self._index, (end, ""))
+            return [
+                self._events[event_id] for _, event_id in self._index[lo:hi]
+                if self._spans[event_id][1] > start
+            ]
+
+    def next_event(self, after: datetime) -> dict | None:
+        """Return the earliest-starting event that has not ended by `after`."""
+        with self._lock:
+            lo = bisect.bisect_left(self._index, (after - self._max_duration, ""))
+            for _, event_id in self._index[lo:]:
+                if self._spans[event_id][1] > after:
+                    return self._events[event_id]
+            return None
+
+    def _sync_pages(self):
+        events = self._service_factory().events()
+        page_token = None
+        while True:
+            params = {"calendarId": self.calendar_id, "singleEvents": True}
+            if page_token:
+                params["pageToken"] = page_token
+            if self._sync_token:
+                params["syncToken"] = self._sync_token
+            page = self._execute(events.list(**params))
+            for event in page.get("items", []):
+                self.apply(event)
+            if not (page_token := page.get("nextPageToken")):
+                self._sync_token = page.get("nextSyncToken")
+                return
+
+    def _clear(self):
+        self._events.clear()
+        self._spans.clear()
+        self._index.clear()
+        self._max_duration = timedelta(0)
+        self._sync_token = None
+
+    def _unindex(self, event_id: str):
+        if (span := self._spans.pop(event_id, None)) is None:
+            return
+        del self._events[event_id]
+        i = bisect.bisect_left(self._index, (span[0], event_id))
+        del self._index[i]
+
+    def _span(self, event: dict) -> tuple[datetime, datetime]:
+        return self._parse(event["start"]), self._parse(event["end"])
+
+    def _parse(self, when: dict) -> datetime:
+        if "dateTime" in when:
+            return datetime.fromisoformat(when["dateTime"])
+        # all-day events are dates in the calendar's own timezone
+        return datetime.combine(date.fromisoformat(when["date"]), datetime.min.time(), self.tz)
+
+    def _poll(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.sync()
+            except Exception:
+                pass  # reads fall back to ensure_fresh() on the next call
@@ -17,6 +17,7 @@ calendar_agent = Agent(
     Path('system_prompts/calendar_assistant.md'),
     6,
     tool_box=calendar_tool_box,
+    max_tool_workers=4,
     description='An assistant that can manage a calendar.'
 )
 
@@ -25,5 +26,7 @@ delegator_agent = Agent(
     20,
     model_name='gpt-4o-mini',
     helper_agents=[email_agent, calendar_agent],
+    max_tool_workers=4,
+    helper_pool_size=3,
     description='An assistant that delegates tasks to other agents.',
 )
\ No newline at end of file
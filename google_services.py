@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+# the Google client libraries take a while to import, so they are only loaded
+# once a Google tool actually runs
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from google_auth_httplib2 import AuthorizedHttp
+
+
+class GoogleServiceManager:
+    """
+    Process-wide, thread-safe holder for Google credentials and API services.
+
+    - Credentials are read from `token_path` once and kept in memory. A background
+      thread refreshes them `refresh_margin` seconds before they expire, and the
+      token file is only rewritten when the token actually changes.
+    - `service(api, version)` builds each API client once and reuses it.
+    - `execute(request)` runs a request on a per-thread HTTP connection, since the
+      underlying httplib2 connections must not be shared between threads.
+
+    Creating a manager is cheap: the Google libraries are imported on first use.
+    """
+
+    def __init__(self,
+        token_path: str = "credentials/token.json",
+        client_secrets_path: str = "credentials/creds.json",
+        scopes: list[str] | None = None,
+        refresh_margin: float = 300,
+    ):
+        self.token_path = token_path
+        self.client_secrets_path = client_secrets_path
+        self.scopes = scopes or []
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self._creds: Credentials | None = None
+        self._services = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._refresher: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def credentials(self) -> Credentials:
+        with self._lock:
+            if self._creds is None:
+                self._creds = self._load()
+                self._start_refresher()
+            if not self._creds.valid or self._expires_soon():
+                self._refresh()
+            return self._creds
+
+    def service(self, api: str, version: str):
+        with self._lock:
+            if (api, version) not in self._services:
+                from googleapiclient.discovery import build
+
+                self._services[api, version] = build(
+                    api, version, credentials=self.credentials(), cache_discovery=False
+                )
+            return self._services[api, version]
+
+    def http(self) -> AuthorizedHttp:
+        """Return this thread's authorized HTTP connection."""
+        if (http := getattr(self._local, "http", None)) is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+
+            http = self._local.http = AuthorizedHttp(self.credentials(), http=httplib2.Http())
+        return http
+
+    def execute(self, request):
+        """Execute an API request on this thread's connection with fresh credentials."""
+        self.credentials()
+        return request.execute(http=self.http())
+
+    def close(self):
+        self._stop.set()
+
+    def _load(self) -> Credentials:
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        creds = None
+        if os.path.exists(self.token_path):
+            creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+        if not creds or (not creds.valid and not creds.refresh_token):
+            flow = InstalledAppFlow.from_client_secrets_file(self.client_secrets_path, self.scopes)
+            creds = flow.run_local_server(port=0)
+            self._persist(creds)
+        return creds
+
+    def _expires_soon(self) -> bool:
+        expiry = self._creds.expiry  # naive UTC, as google-auth stores it
+        return expiry is not None and expiry - self.refresh_margin <= datetime.utcnow()
+
+    def _refresh(self):
+        from google.auth.transport.requests import Request
+
+        token = self._creds.token
+        self._creds.refresh(Request())
+        if self._creds.token != token:
+            self._persist(self._creds)
+
+    def _persist(self, creds: Credentials):
+        os.makedirs(os.path.dirname(self.token_path) or ".", exist_ok=True)
+        with open(self.token_path, "w") as token:
+            token.write(creds.to_json())
+
+    def _start_refresher(self):
+        if self._refresher is None:
+            self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            with self._lock:
+                expiry = self._creds.expiry
+            wait = 60.0 if expiry is None else max(
+                (expiry - self.refresh_margin - datetime.utcnow()).total_seconds(), 1.0
+            )
+            if self._stop.wait(wait):
+                return
+            try:
+                with self._lock:
+                    if self._expires_soon():
+                        self._refresh()
+            except Exception:
+                # back off; foreground calls still refresh on demand
+                if self._stop.wait(30):
+                    return
@@ -7,18 +7,35 @@ import mimetypes
 import pandas as pd
 from dotenv import load_dotenv
 from openai import OpenAI
+from agentics_lundmj.client import shared_client
 from IPython.display import HTML, display
 from typing import Any
 
 
 # === Env & Clients ===
 load_dotenv()
-openai_client = OpenAI()
+_openai_client: OpenAI | None = None
+
+
+def get_openai_client() -> OpenAI:
+    """The process-wide shared client (and connection pool), created on first use."""
+    global _openai_client
+    if _openai_client is None:
+        # these calls bypass the scheduler, so they keep the SDK's own retries
+        _openai_client = shared_client().with_options(max_retries=2)
+    return _openai_client
+
+
+def __getattr__(name: str):
+    # keeps `utils.openai_client` working for existing notebooks
+    if name == "openai_client":
+        return get_openai_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_response(model: str, prompt: str) -> str:
     # Default to OpenAI format for all other models (gpt-4, o3-mini, o1, etc.)
-    response = openai_client.responses.create(
+    response = get_openai_client().responses.create(
         model=model,
         input=prompt,
     )
@@ -27,7 +44,7 @@ def get_response(model: str, prompt: str) -> str:
 
 def image_openai_call(model_name: str, prompt: str, media_type: str, b64: str) -> str:
     data_url = f"data:{media_type};base64,{b64}"
-    resp = openai_client.responses.create(
+    resp = get_openai_client().responses.create(
         model=model_name,
         input=[
             {
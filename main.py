@@ -2,8 +2,7 @@ import sys
 import argparse
 from pathlib import Path
 
-import tools
-from agentics_lundmj.agent import Agent
+from agentics_lundmj.tool_registry import resolve_tool_box
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -15,16 +14,23 @@ def main(
     model_name: str = 'gpt-4.1',
     tool_box: str = None,
     verbose: bool = False,
+    stream: bool = False,
+    cascade_models: list[str] = [],
 ):
+    # imported here so that `--help` does not wait for the OpenAI SDK
+    from agentics_lundmj.agent import Agent
+
     if tool_box:
-        tool_box = getattr(tools, tool_box, None)
+        # a name defined in tools.py, a registered name, or a "module:attribute" path
+        tool_box = resolve_tool_box(tool_box, default_module='tools')
     Agent(
         prompt_file=prompt_file,
         history_limit=history_limit,
         model_name=model_name,
         tool_box=tool_box,
         verbose=verbose,
-    ).run()
+        cascade_models=cascade_models,
+    ).run(stream=stream)
     print('\n' + "#"*60 + '\n')
 
 if __name__ == '__main__':
@@ -43,12 +49,20 @@ if __name__ == '__main__':
     )
     parser.add_argument('-t', '--tool-box',
         type=str, default=None, dest='tool_box',
-        help='name of the tool box to use',
+        help='tool box to use: a name from tools.py, an installed entry point, or module:attribute',
     )
     parser.add_argument('-v', '--verbose',
         action='store_true', dest='verbose',
         help='enable verbose output',
     )
+    parser.add_argument('-s', '--stream',
+        action='store_true', dest='stream',
+        help='print responses as they are generated',
+    )
+    parser.add_argument('-c', '--cascade',
+        type=str, action='append', default=[], dest='cascade_models',
+        help='cheaper model to try before --model, escalating when unsure (repeatable, cheapest first)',
+    )
     parser.add_argument('--history-limit', '-H',
         type=int, default=20, dest='history_limit',
         help='maximum number of past messages to keep in history',
@@ -62,4 +76,6 @@ if __name__ == '__main__':
         model_name=args.model,
         tool_box=args.tool_box,
         verbose=args.verbose,
+        stream=args.stream,
+        cascade_models=args.cascade_models,
     )
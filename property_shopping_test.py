@@ -1,10 +1,20 @@
+import os
+
 from dotenv import load_dotenv
 load_dotenv()
 
 from agentics_lundmj.agent import Agent
 from agentics_lundmj.tool_box import ToolBox
+from agentics_lundmj.response_cache import MemoryCache, SQLiteCache, TieredCache
+from agentics_lundmj.cassette import Cassette
 tb = ToolBox()
 
+# CASSETTE_MODE=record|replay|auto records the conversations to (or replays them
+# from) a cassette instead of using the response cache
+cassette_mode = os.environ.get('CASSETTE_MODE')
+cassette = Cassette('cassettes/property_shopping.jsonl', cassette_mode) if cassette_mode else None
+response_cache = None if cassette else TieredCache(MemoryCache(), SQLiteCache('cache/responses.sqlite'))
+
 log_grade = print
 
 @tb.tool
@@ -35,13 +45,18 @@ for model in models:
         prompt_file='system_prompts/property_shopper.md',
         history_limit=10,
         model_name=model,
+        response_cache=response_cache,
     )
     grader = Agent(
         prompt_file='system_prompts/shopper_grader.md',
         history_limit=10,
         model_name=grader_model,
         tool_box=tb,
+        response_cache=response_cache,
     )
+    if cassette:
+        cassette.attach(shopper)
+        cassette.attach(grader)
     interest_message = shopper.chat_once("Email")
     print(interest_message)
     grader.chat_once(interest_message)
@@ -0,0 +1,356 @@
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from aiohttp import WSMsgType, web
+
+from agentics_lundmj.agent import Agent
+from agentics_lundmj.session_store import SessionStore
+from agentics_lundmj.tool_registry import resolve_tool_box
+
+from dotenv import load_dotenv
+load_dotenv()
+
+
+class Busy(Exception):
+    """Raised when the server cannot admit another session or turn."""
+
+
+class Session:
+    def __init__(self, agent: Agent):
+        self.agent = agent
+        self.lock = asyncio.Lock()  # one turn at a time per session
+        self.users = 0  # requests holding or waiting for the lock
+        self.last_used = time.monotonic()
+
+
+class SessionManager:
+    """
+    Hosts many agent sessions in one process.
+
+    Every session gets its own fork of a template agent. Turns run on a thread pool
+    of `max_concurrent` workers; up to `max_queued` more may wait for a worker, and
+    anything beyond that is turned away. A session runs one turn at a time and holds
+    at most `max_per_session` turns (running or waiting) before refusing more. Sessions idle for `idle_timeout` seconds
+    are evicted; with a `SessionStore` they are resumed from disk on their next
+    request.
+    """
+
+    def __init__(
+        self,
+        template: Agent,
+        max_sessions: int = 1000,
+        max_concurrent: int = 32,
+        max_queued: int = 256,
+        idle_timeout: float = 900,
+        store: SessionStore | None = None,
+        max_per_session: int = 4,
+    ):
+        self.template = template
+        self.max_sessions = max_sessions
+        self.max_queued = max_queued
+        self.max_per_session = max_per_session
+        self.idle_timeout = idle_timeout
+        self.store = store
+        self.sessions: dict[str, Session] = {}
+        self.active_turns = 0
+        self.queued_turns = 0
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="turn")
+
+    def get(self, session_id: str) -> Session:
+        if session := self.sessions.get(session_id):
+            session.last_used = time.monotonic()
+            return session
+        if len(self.sessions) >= self.max_sessions and not self._evict_oldest_idle():
+            raise Busy("too many sessions")
+        agent = self.template.fork()
+        if self.store:
+            self.store.attach(agent, session_id)
+        session = self.sessions[session_id] = Session(agent)
+        return session
+
+    def _evict_oldest_idle(self) -> bool:
+        idle = [(s.last_used, sid) for sid, s in self.sessions.items() if not s.users]
+        if not idle:
+            return False
+        self.close(min(idle)[1])
+        return True
+
+    def evict_idle(self) -> int:
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = [
+            sid for sid, s in self.sessions.items()
+            if s.last_used < cutoff and not s.users
+        ]
+        for session_id in expired:
+            self.close(session_id)
+        return len(expired)
+
+    def close(self, session_id: str):
+        if (session := self.sessions.pop(session_id, None)) and session.agent._journal:
+            session.agent._journal.close()
+
+    def delete(self, session_id: str):
+        """Close the session and drop it from the store. Refused while a turn holds or awaits it."""
+        if (session := self.sessions.get(session_id)) and session.users:
+            raise Busy("session is in use")
+        self.close(session_id)
+        if self.store:
+            self.store.delete(session_id)
+
+    async def _admit(self):
+        if self._slots.locked() and self.queued_turns >= self.max_queued:
+            raise Busy("too many turns in flight")
+        self.queued_turns += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued_turns -= 1
+        self.active_turns += 1
+
+    def _release(self):
+        self.active_turns -= 1
+        self._slots.release()
+
+    @asynccontextmanager
+    async def turn(self, session_id: str):
+        """Hold a session's lock and a worker slot for one turn."""
+        session = self.get(session_id)
+        # turns waiting for the session lock hold no worker slot, so they are capped here
+        if session.users >= self.max_per_session:
+            raise Busy("too many turns queued for this session")
+        session.users += 1
+        try:
+            async with session.lock:
+                await self._admit()
+                try:
+                    yield session
+                finally:
+                    self._release()
+        finally:
+            session.users -= 1
+            session.last_used = time.monotonic()
+
+    async def chat(self, session_id: str, message: str) -> str:
+        async with self.turn(session_id) as session:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, session.agent.chat_once, message)
+
+    async def chat_stream(self, session_id: str, message: str):
+        """Yield the reply's text deltas as the agent produces them."""
+        async with self.turn(session_id) as session:
+            loop = asyncio.get_running_loop()
+            chunks: asyncio.Queue = asyncio.Queue()
+            done = object()
+            cancelled = threading.Event()
+
+            def produce():
+                # drive the blocking generator on a worker, handing chunks to the loop
+                try:
+                    for chunk in session.agent.chat_stream(message):
+                        if cancelled.is_set():
+                            break
+                        loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+                except Exception as e:
+                    loop.call_soon_threadsafe(chunks.put_nowait, e)
+                loop.call_soon_threadsafe(chunks.put_nowait, done)
+
+            future = loop.run_in_executor(self._executor, produce)
+            try:
+                while (chunk := await chunks.get()) is not done:
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    yield chunk
+            finally:
+                cancelled.set()
+                await asyncio.shield(future)
+
+    async def evict_forever(self, interval: float = 60):
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    def shutdown(self):
+        for session_id in list(self.sessions):
+            self.close(session_id)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ids name directories in the session store, so nothing path-like gets through
+SESSION_ID = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+
+def _session_id(request: web.Request) -> str:
+    session_id = request.match_info["session_id"]
+    if not SESSION_ID.fullmatch(session_id):
+        raise web.HTTPBadRequest(
+            text=json.dumps({"error": "invalid session id"}), content_type="application/json",
+        )
+    return session_id
+
+
+def _busy(error: Busy) -> web.Response:
+    return web.json_response({"error": str(error)}, status=503, headers={"Retry-After": "1"})
+
+
+async def post_message(request: web.Request) -> web.Response:
+    manager: SessionManager = request.app["sessions"]
+    session_id = _session_id(request)
+    try:
+        body = await request.json()
+        message = body["message"]
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return web.json_response({"error": 'expected {"message": "..."}'}, status=400)
+    try:
+        reply = await manager.chat(session_id, message)
+    except Busy as e:
+        return _busy(e)
+    return web.json_response({"reply": reply})
+
+
+async def delete_session(request: web.Request) -> web.Response:
+    manager: SessionManager = request.app["sessions"]
+    try:
+        manager.delete(_session_id(request))
+    except Busy as e:
+        return web.json_response({"error": str(e)}, status=409, headers={"Retry-After": "1"})
+    return web.Response(status=204)
+
+
+async def stream_session(request: web.Request) -> web.WebSocketResponse:
+    """
+    Each text frame is a message (plain text or `{"message": ...}`). The reply comes
+    back as `{"type": "delta", "text": ...}` frames followed by `{"type": "done"}`.
+    """
+    manager: SessionManager = request.app["sessions"]
+    session_id = _session_id(request)
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+    async for frame in ws:
+        if frame.type != WSMsgType.TEXT:
+            continue
+        try:
+            message = frame.data
+            if message.startswith("{"):
+                message = json.loads(message).get("message")
+            if not isinstance(message, str):
+                raise ValueError('expected text or {"message": "..."}')
+            reply = []
+            async for chunk in manager.chat_stream(session_id, message):
+                reply.append(chunk)
+                await ws.send_json({"type": "delta", "text": chunk})
+            await ws.send_json({"type": "done", "reply": "".join(reply)})
+        except Busy as e:
+            await ws.send_json({"type": "error", "error": str(e), "retry": True})
+        except Exception as e:
+            await ws.send_json({"type": "error", "error": str(e)})
+    return ws
+
+
+async def health(request: web.Request) -> web.Response:
+    manager: SessionManager = request.app["sessions"]
+    return web.json_response({
+        "sessions": len(manager.sessions),
+        "active_turns": manager.active_turns,
+        "queued_turns": manager.queued_turns,
+    })
+
+
+def make_app(manager: SessionManager) -> web.Application:
+    app = web.Application()
+    app["sessions"] = manager
+    app.router.add_get("/health", health)
+    app.router.add_post("/sessions/{session_id}/messages", post_message)
+    app.router.add_delete("/sessions/{session_id}", delete_session)
+    app.router.add_get("/sessions/{session_id}/stream", stream_session)
+
+    async def background_eviction(app):
+        task = asyncio.create_task(manager.evict_forever())
+        yield
+        task.cancel()
+        manager.shutdown()
+    app.cleanup_ctx.append(background_eviction)
+    return app
+
+
+def main(
+    prompt_file: Path,
+    history_limit: int,
+    model_name: str = 'gpt-4.1',
+    tool_box: str = None,
+    host: str = '127.0.0.1',
+    port: int = 8080,
+    max_sessions: int = 1000,
+    max_concurrent: int = 32,
+    max_queued: int = 256,
+    idle_timeout: float = 900,
+    sessions_dir: Path | None = None,
+    max_per_session: int = 4,
+):
+    if tool_box:
+        tool_box = resolve_tool_box(tool_box, default_module='tools')
+    template = Agent(
+        prompt_file=prompt_file,
+        history_limit=history_limit,
+        model_name=model_name,
+        tool_box=tool_box,
+    )
+    manager = SessionManager(
+        template,
+        max_sessions=max_sessions,
+        max_concurrent=max_concurrent,
+        max_queued=max_queued,
+        idle_timeout=idle_timeout,
+        store=SessionStore(sessions_dir) if sessions_dir else None,
+        max_per_session=max_per_session,
+    )
+    web.run_app(make_app(manager), host=host, port=port)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve agent sessions over HTTP and WebSocket.')
+    parser.add_argument('prompt_file', type=Path, help='path to system prompt file')
+    parser.add_argument('-m', '--model', type=str, default='gpt-4.1', dest='model',
+        help='model name to use')
+    parser.add_argument('-t', '--tool-box', type=str, default=None, dest='tool_box',
+        help='tool box to use: a name from tools.py, an installed entry point, or module:attribute')
+    parser.add_argument('--history-limit', '-H', type=int, default=20, dest='history_limit',
+        help='maximum number of past messages to keep in history')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-sessions', type=int, default=1000,
+        help='sessions held in memory before idle ones are evicted early')
+    parser.add_argument('--max-concurrent', type=int, default=32,
+        help='turns running at once')
+    parser.add_argument('--max-queued', type=int, default=256,
+        help='turns waiting for a worker before new ones are rejected')
+    parser.add_argument('--max-per-session', type=int, default=4,
+        help='turns a single session may have running or waiting')
+    parser.add_argument('--idle-timeout', type=float, default=900,
+        help='seconds of inactivity before a session is evicted')
+    parser.add_argument('--sessions-dir', type=Path, default=None,
+        help='persist sessions here so evicted sessions can be resumed')
+
+    args = parser.parse_args()
+
+    main(
+        args.prompt_file,
+        args.history_limit,
+        model_name=args.model,
+        tool_box=args.tool_box,
+        host=args.host,
+        port=args.port,
+        max_sessions=args.max_sessions,
+        max_concurrent=args.max_concurrent,
+        max_queued=args.max_queued,
+        idle_timeout=args.idle_timeout,
+        sessions_dir=args.sessions_dir,
+        max_per_session=args.max_per_session,
+    )
@@ -9,7 +9,7 @@ setup(
     long_description=open("README.md").read(),  # Ensure you have a README.md file
     long_description_content_type="text/markdown",
     url="https://github.com/lundmj/aiAgents",  # Replace with your repository URL
-    packages=find_packages(),  # Automatically find all packages in the directory
+    packages=find_packages(exclude=["benchmarks*"]),  # Automatically find all packages in the directory, except the benchmark suite
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",  # Replace with your license
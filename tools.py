@@ -1,14 +1,20 @@
 import os
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from datetime import datetime
+from typing import TypedDict
 
 from agentics_lundmj.tool_box import ToolBox
+from google_services import GoogleServiceManager
+from calendar_mirror import CalendarMirror
 
 SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
 
+# Calendar reads are cached briefly; any calendar write flushes them
+CALENDAR_CACHE = "calendar"
+CALENDAR_CACHE_TTL = 60
+
+# Google Calendar accepts at most this many calls per batch request
+CALENDAR_BATCH_LIMIT = 50
+
 # Current directory
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -18,25 +24,42 @@ calendar_tool_box = ToolBox()
 rag_tool_box = ToolBox()
 audio_tool_box = ToolBox()
 property_tool_box = ToolBox(
-    log_file=os.path.join(current_dir, "log", "property_tool_calls.log")
+    log_file=os.path.join(current_dir, "log", "property_tool_calls.jsonl")
+)
+
+# Shared by every Google tool: credentials and services stay in memory
+google = GoogleServiceManager(
+    token_path="credentials/token.json",
+    client_secrets_path="credentials/creds.json",
+    scopes=SCOPES,
 )
 
 def get_creds():
     """
     Retrieves Google API credentials, refreshing or generating them if necessary.
     """
-    creds = None
-    if os.path.exists("credentials/token.json"):
-        creds = Credentials.from_authorized_user_file("credentials/token.json", SCOPES)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file("credentials/creds.json", SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open("credentials/token.json", "w") as token:
-            token.write(creds.to_json())
-    return creds
+    return google.credentials()
+
+def calendar_service():
+    return google.service("calendar", "v3")
+
+def run_calendar_batch(requests: list) -> list[tuple[dict | None, Exception | None]]:
+    """
+    Sends Calendar API requests as batch HTTP requests (one round trip per
+    CALENDAR_BATCH_LIMIT calls). Returns (response, error) per request, in order.
+    """
+    results = [(None, None)] * len(requests)
+
+    def collect(request_id, response, exception):
+        results[int(request_id)] = (response, exception)
+
+    service = calendar_service()
+    for offset in range(0, len(requests), CALENDAR_BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=collect)
+        for i, request in enumerate(requests[offset:offset + CALENDAR_BATCH_LIMIT], start=offset):
+            batch.add(request, request_id=str(i))
+        google.execute(batch)
+    return results
 
 def get_tz_name() -> str:
     """
@@ -83,6 +106,21 @@ def get_tz_name() -> str:
 
     return "UTC"
 
+def _local_tz():
+    from zoneinfo import ZoneInfo
+    return ZoneInfo(get_tz_name())
+
+# Local copy of the primary calendar; read tools answer from it, writes update it
+calendar_mirror = CalendarMirror(calendar_service, execute=google.execute, tz=_local_tz())
+
+def _event_summary(event: dict) -> dict:
+    return {
+        "summary": event.get("summary", ""),
+        "start": event["start"].get("dateTime", event["start"].get("date")),
+        "description": event.get("description", "No description provided."),
+        "eventId": event["id"],
+    }
+
 @property_tool_box.tool
 def grade_reply(
     platform_score: int,
@@ -143,7 +181,7 @@ def grade_reply(
     )
     return "Success: Grade report generated."
 
-@calendar_tool_box.tool
+@calendar_tool_box.tool(concurrent=False, invalidates=CALENDAR_CACHE)
 def create_calendar_event(
     event_title: str,
     year: int,
@@ -193,8 +231,7 @@ def create_calendar_event(
 
     end_dt = start_dt + timedelta(minutes=duration_minutes)
 
-    creds = get_creds()
-    service = build("calendar", "v3", credentials=creds)
+    service = calendar_service()
     tz = get_tz_name()
     event = {
         "summary": event_title,
@@ -203,7 +240,8 @@ def create_calendar_event(
         "end": {"dateTime": end_dt.isoformat(), "timeZone": tz},
     }
 
-    event = service.events().insert(calendarId="primary", body=event).execute()
+    event = google.execute(service.events().insert(calendarId="primary", body=event))
+    calendar_mirror.apply(event)
     return event.get("htmlLink")
 
 @email_tool_box.tool
@@ -215,7 +253,7 @@ def get_current_datetime(format: str = "%Y-%m-%d %H:%M:%S") -> str:
     """
     return datetime.now().strftime(format)
 
-@email_tool_box.tool
+@email_tool_box.tool(concurrent=False)
 def send_email(to: str, subject: str, body: str) -> str:
     """
     Sends an email using SMTP.
@@ -259,7 +297,7 @@ def send_email(to: str, subject: str, body: str) -> str:
     except Exception as e:
         return f"Failure: {e}"
 
-@calendar_tool_box.tool
+@calendar_tool_box.tool(concurrent=False, invalidates=CALENDAR_CACHE)
 def delete_calendar_event(event_id: str) -> str:
     """
     Deletes a Google Calendar event by its event_id.
@@ -269,14 +307,14 @@ def delete_calendar_event(event_id: str) -> str:
     Returns a success message or an error message if the deletion fails.
     """
     try:
-        creds = get_creds()
-        service = build("calendar", "v3", credentials=creds)
-        service.events().delete(calendarId="primary", eventId=event_id).execute()
+        service = calendar_service()
+        google.execute(service.events().delete(calendarId="primary", eventId=event_id))
+        calendar_mirror.remove(event_id)
         return f"Success: Event with ID {event_id} has been deleted."
     except Exception as e:
         return f"Failure: Could not delete event with ID {event_id}. Error: {e}"
 
-@calendar_tool_box.tool
+@calendar_tool_box.tool(cache=CALENDAR_CACHE, ttl=CALENDAR_CACHE_TTL)
 def list_events_on_date(year: int, month: int, day: int) -> list:
     """
     Lists all events happening on a specific date.
@@ -298,40 +336,19 @@ def list_events_on_date(year: int, month: int, day: int) -> list:
         start_time = datetime(year, month, day, tzinfo=tz)
         end_time = start_time + timedelta(days=1)
 
-        creds = get_creds()
-        service = build("calendar", "v3", credentials=creds)
-
-        # Query events within the time range
-        events_result = service.events().list(
-            calendarId="primary",
-            timeMin=start_time.isoformat(),
-            timeMax=end_time.isoformat(),
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
-
-        events = events_result.get("items", [])
+        # Answer from the local mirror (synced incrementally when stale)
+        calendar_mirror.ensure_fresh()
+        events = calendar_mirror.events_between(start_time, end_time)
 
         if not events:
             return [{"message": "No events found for the specified date."}]
 
-        # Format the events into a list of dictionaries
-        event_list = []
-        for event in events:
-            start = event["start"].get("dateTime", event["start"].get("date"))
-            event_list.append({
-                "summary": event["summary"],
-                "start": start,
-                "description": event.get("description", "No description provided."),
-                "eventId": event["id"],
-            })
-
-        return event_list
+        return [_event_summary(event) for event in events]
 
     except Exception as e:
         return [{"error": f"Failure: Could not retrieve events. Error: {e}"}]
 
-@calendar_tool_box.tool
+@calendar_tool_box.tool(cache=CALENDAR_CACHE, ttl=CALENDAR_CACHE_TTL)
 def get_next_event() -> dict:
     """
     Retrieves the next upcoming event from the current time.
@@ -340,42 +357,21 @@ def get_next_event() -> dict:
     or an error message if no events are found or the query fails.
     """
     try:
-        from datetime import datetime
-
-        # Define the current time as the starting point
-        now = datetime.utcnow().isoformat() + "Z"
-
-        creds = get_creds()
-        service = build("calendar", "v3", credentials=creds)
+        from datetime import datetime, timezone
 
-        # Query the next event starting from now
-        events_result = service.events().list(
-            calendarId="primary",
-            timeMin=now,
-            maxResults=1,
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
+        # Answer from the local mirror (synced incrementally when stale)
+        calendar_mirror.ensure_fresh()
+        event = calendar_mirror.next_event(datetime.now(timezone.utc))
 
-        events = events_result.get("items", [])
-
-        if not events:
+        if not event:
             return {"message": "No upcoming events found."}
 
-        # Extract details of the next event
-        event = events[0]
-        start = event["start"].get("dateTime", event["start"].get("date"))
-        return {
-            "summary": event["summary"],
-            "start": start,
-            "description": event.get("description", "No description provided."),
-            "eventId": event["id"],
-        }
+        return _event_summary(event)
 
     except Exception as e:
         return {"error": f"Failure: Could not retrieve the next event. Error: {e}"}
 
-@calendar_tool_box.tool
+@calendar_tool_box.tool(concurrent=False, invalidates=CALENDAR_CACHE)
 def update_calendar_event(
     event_id: str,
     new_title: str = None,
@@ -395,11 +391,10 @@ def update_calendar_event(
     Returns a success message or an error message if the update fails.
     """
     try:
-        creds = get_creds()
-        service = build("calendar", "v3", credentials=creds)
+        service = calendar_service()
 
         # Fetch the existing event
-        event = service.events().get(calendarId="primary", eventId=event_id).execute()
+        event = google.execute(service.events().get(calendarId="primary", eventId=event_id))
 
         # Update the fields if new values are provided
         if new_title:
@@ -412,9 +407,88 @@ def update_calendar_event(
             event["description"] = new_description
 
         # Update the event on the calendar
-        updated_event = service.events().update(calendarId="primary", eventId=event_id, body=event).execute()
+        updated_event = google.execute(
+            service.events().update(calendarId="primary", eventId=event_id, body=event)
+        )
+        calendar_mirror.apply(updated_event)
 
         return f"Success: Event with ID {event_id} has been updated."
 
     except Exception as e:
         return f"Failure: Could not update event with ID {event_id}. Error: {e}"
+
+class EventUpdate(TypedDict):
+    event_id: str
+    new_title: str
+    new_start_time: str
+    new_end_time: str
+    new_description: str
+
+@calendar_tool_box.tool(concurrent=False, invalidates=CALENDAR_CACHE)
+def update_calendar_events(updates: list[EventUpdate]) -> list:
+    """
+    Updates several Google Calendar events in a single batch request. Prefer this
+    over repeated update_calendar_event calls when changing more than one event.
+
+    updates: One entry per event. event_id identifies the event; leave any new_*
+    field as an empty string to keep its current value. Times are RFC3339.
+
+    Returns one result per update, in the same order.
+    """
+    try:
+        service = calendar_service()
+        requests = []
+        for update in updates:
+            patch = {}
+            if update["new_title"]:
+                patch["summary"] = update["new_title"]
+            if update["new_start_time"]:
+                patch["start"] = {"dateTime": update["new_start_time"]}
+            if update["new_end_time"]:
+                patch["end"] = {"dateTime": update["new_end_time"]}
+            if update["new_description"]:
+                patch["description"] = update["new_description"]
+            requests.append(service.events().patch(
+                calendarId="primary", eventId=update["event_id"], body=patch
+            ))
+        outcomes = run_calendar_batch(requests)
+    except Exception as e:
+        return [{"eventId": u["event_id"], "error": f"Failure: {e}"} for u in updates]
+
+    results = []
+    for update, (event, error) in zip(updates, outcomes):
+        if error:
+            results.append({"eventId": update["event_id"], "error": f"Failure: {error}"})
+        else:
+            calendar_mirror.apply(event)
+            results.append({"eventId": update["event_id"], "result": "Success"})
+    return results
+
+@calendar_tool_box.tool(concurrent=False, invalidates=CALENDAR_CACHE)
+def delete_calendar_events(event_ids: list[str]) -> list:
+    """
+    Deletes several Google Calendar events in a single batch request. Prefer this
+    over repeated delete_calendar_event calls when removing more than one event.
+
+    event_ids: The unique identifiers of the events to delete.
+
+    Returns one result per event, in the same order.
+    """
+    try:
+        service = calendar_service()
+        requests = [
+            service.events().delete(calendarId="primary", eventId=event_id)
+            for event_id in event_ids
+        ]
+        outcomes = run_calendar_batch(requests)
+    except Exception as e:
+        return [{"eventId": event_id, "error": f"Failure: {e}"} for event_id in event_ids]
+
+    results = []
+    for event_id, (_, error) in zip(event_ids, outcomes):
+        if error:
+            results.append({"eventId": event_id, "error": f"Failure: {error}"})
+        else:
+            calendar_mirror.remove(event_id)
+            results.append({"eventId": event_id, "result": "Success"})
+    return results